@@ -1,26 +1,26 @@
+import os
+
 from flask import Flask
 from flask_mail import Mail
 from app.extensions import db, login_manager, migrate
-from app.models import User
-from flask_login import current_user
+from config import DEFAULT_SECRET_KEY, config_by_name
 
 mail = Mail()
 
-def create_app():
+def create_app(config_name=None):
+    """Build the app for a config profile from ``config.config_by_name``.
+
+    The profile defaults to the APP_ENV environment variable, then to
+    "development".
+    """
+    config_name = config_name or os.environ.get("APP_ENV", "development")
     app = Flask(__name__)
-    app.config.from_object("config.Config")
-    login_manager.init_app(app)
-    # Optional inline overrides
-    app.config['SECRET_KEY'] = 'bwami123'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///your.db'
-
-    # Email configuration
-    app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-    app.config['MAIL_PORT'] = 587
-    app.config['MAIL_USE_TLS'] = True
-    app.config['MAIL_USERNAME'] = 'bwamistevenez001@gmail.com'
-    app.config['MAIL_PASSWORD'] = 'bwami123'
-    app.config['MAIL_DEFAULT_SENDER'] = 'littlefox007j@gmail.com'
+    app.config.from_object(config_by_name[config_name])
+    if config_name == "production":
+        if app.config["SECRET_KEY"] in (None, "", DEFAULT_SECRET_KEY):
+            raise RuntimeError("Set SECRET_KEY in the environment for production.")
+        if not app.config["SQLALCHEMY_DATABASE_URI"]:
+            raise RuntimeError("Set DATABASE_URL in the environment for production.")
 
     # Initialize extensions
     db.init_app(app)
@@ -28,16 +28,54 @@ def create_app():
     migrate.init_app(app, db)
     mail.init_app(app)
 
-    @app.context_processor
-    def inject_user():
-        return dict(current_user=current_user)
+    from app.sqlite_tuning import configure_sqlite
+    from app.metrics import init_metrics
+    with app.app_context():
+        configure_sqlite(db.engine, app.config.get("SQLITE_PRAGMAS"))
+        init_metrics(app, db.engine)
+
+    from app.write_buffer import init_write_buffer
+    init_write_buffer(app)
+
+    from app.cache import configure_user_cache, init_page_cache, load_cached_user
+    configure_user_cache(app)
+    init_page_cache(app)
+
+    from app.ratelimit import init_rate_limits
+    init_rate_limits(app)
+
+    from app.passwords import init_password_hasher
+    init_password_hasher(app)
 
+    # Flask-Login already exposes current_user to templates, and resolves it
+    # at most once per request.
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return load_cached_user(int(user_id))
 
     # Register Blueprints
     from app.routes import main
     app.register_blueprint(main)
 
+    from app.outbox import outbox_cli
+    app.cli.add_command(outbox_cli)
+
+    from app.tasks import tasks_cli
+    app.cli.add_command(tasks_cli)
+
+    from app.counters import counters_cli
+    app.cli.add_command(counters_cli)
+
+    from app.users import users_cli
+    app.cli.add_command(users_cli)
+
+    from app.schema import schema_cli
+    app.cli.add_command(schema_cli)
+
+    from app.templating import init_template_cache
+    init_template_cache(app)
+
+    from app.prerender import init_prerender
+    init_prerender(app)
+
     return app  # ✅ this must be inside the create_app() function
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+
+from werkzeug.exceptions import BadRequest
+
+from app.counters import adjust_model
+from app.extensions import db
+
+# Ids per IN (...) list, under SQLite's bound-parameter limit.
+ID_BATCH_SIZE = 500
+IMPORT_BATCH_SIZE = 1000
+
+
+def parse_ids(request):
+    """Ids from a JSON body ``{"ids": [...]}`` or repeated ``ids`` form fields."""
+    if request.is_json:
+        raw = (request.get_json(silent=True) or {}).get("ids") or []
+    else:
+        raw = request.form.getlist("ids")
+    try:
+        ids = sorted({int(i) for i in raw})
+    except (TypeError, ValueError):
+        raise BadRequest("ids must be integers.")
+    if not ids:
+        raise BadRequest("No ids given.")
+    return ids
+
+
+def batches(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def bulk_delete(model, ids):
+    """Delete every ``model`` row in ``ids`` in one transaction; returns the count.
+
+    ``Query.delete()`` skips mapper events, so the row counter is adjusted
+    here.
+    """
+    deleted = 0
+    for chunk in batches(ids, ID_BATCH_SIZE):
+        deleted += model.query.filter(model.id.in_(chunk)).delete(synchronize_session=False)
+    adjust_model(db.session.connection(), model, -deleted)
+    db.session.commit()
+    return deleted
+
+
+def bulk_update(model, ids, values):
+    """Apply ``values`` to every ``model`` row in ``ids`` in one transaction."""
+    updated = 0
+    for chunk in batches(ids, ID_BATCH_SIZE):
+        updated += model.query.filter(model.id.in_(chunk)).update(values, synchronize_session=False)
+    db.session.commit()
+    return updated
+
+
+def read_rows(upload):
+    """Rows of an uploaded ``.csv`` (with a header line) or ``.json`` (a list of objects)."""
+    filename = (upload.filename or "").lower()
+    text = io.TextIOWrapper(upload.stream, encoding="utf-8-sig")
+    if filename.endswith(".csv"):
+        return list(csv.DictReader(text))
+    if filename.endswith(".json"):
+        try:
+            rows = json.load(text)
+        except ValueError as exc:
+            raise BadRequest(f"Invalid JSON: {exc}")
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise BadRequest("JSON imports must be a list of objects.")
+        return rows
+    raise BadRequest("Import a .csv or .json file.")
+
+
+def bulk_import(model, rows, required, optional=(), converters=None):
+    """Insert ``rows`` as ``model`` rows in batches; returns the count.
+
+    Every row is checked before anything is written, so a bad row rejects
+    the whole file. Unknown keys are ignored; ``converters`` maps a field to
+    a function turning its text into the column's type.
+    """
+    converters = converters or {}
+    mappings = []
+    for line, row in enumerate(rows, start=1):
+        missing = [field for field in required if not str(row.get(field) or "").strip()]
+        if missing:
+            raise BadRequest(f"Row {line} is missing {', '.join(missing)}.")
+        mapping = {}
+        for field in (*required, *optional):
+            value = row.get(field)
+            if value in (None, ""):
+                continue
+            try:
+                mapping[field] = converters[field](value) if field in converters else value
+            except (TypeError, ValueError):
+                raise BadRequest(f"Row {line} has an invalid {field}.")
+        mappings.append(mapping)
+
+    for chunk in batches(mappings, IMPORT_BATCH_SIZE):
+        db.session.bulk_insert_mappings(model, chunk)
+    adjust_model(db.session.connection(), model, len(mappings))
+    db.session.commit()
+    return len(mappings)
@@ -0,0 +1,235 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+
+from app.extensions import db
+from app.models import User
+
+
+class TTLCache:
+    """A small thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if isinstance(k, str) and k.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """The same interface as ``TTLCache``, backed by a SQLite file.
+
+    Lets several worker processes on one box share entries, and lets an
+    invalidation in one worker reach the others.
+    """
+
+    # Expired rows are deleted on every this many writes.
+    PURGE_EVERY = 1000
+
+    def __init__(self, path, ttl=60):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires >= ?", (key, time.time())
+        ).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        self._connect().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge()
+
+    def purge(self):
+        self._connect().execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_prefix(self, prefix):
+        self._connect().execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache")
+
+
+def snapshot(obj):
+    """Plain column values of a model instance, safe to cache and pickle.
+
+    Templates read them with the same ``obj.attr`` syntax.
+    """
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs}
+
+
+def init_page_cache(app):
+    ttl = app.config.get("PAGE_CACHE_TTL", 300)
+    if app.config.get("PAGE_CACHE_BACKEND", "memory") == "sqlite":
+        path = app.config.get("PAGE_CACHE_PATH") or os.path.join(app.instance_path, "page_cache.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        backend = SQLiteCache(path, ttl=ttl)
+    else:
+        backend = TTLCache(maxsize=app.config.get("PAGE_CACHE_SIZE", 512), ttl=ttl)
+    app.extensions["page_cache"] = backend
+    return backend
+
+
+def cached(key, producer, ttl=None):
+    """Return the cached value for ``key``, computing it with ``producer`` on a miss."""
+    backend = current_app.extensions["page_cache"]
+    value = backend.get(key)
+    if value is None:
+        value = producer()
+        backend.set(key, value, ttl)
+    return value
+
+
+def invalidate(*keys, prefix=None):
+    backend = current_app.extensions["page_cache"]
+    for key in keys:
+        backend.delete(key)
+    if prefix:
+        backend.delete_prefix(prefix)
+
+
+# Not cached, so authorization always reads the current value: a role
+# change takes effect on the next request even in a worker, or with a
+# backend, that never saw the invalidation.
+UNCACHED_USER_COLUMNS = ("role",)
+
+user_cache = TTLCache()
+
+
+def configure_user_cache(app):
+    """Pick the user cache backend; the same choices as the page cache.
+
+    With "sqlite" the entries live in one file that every worker and CLI
+    command on the box uses, so an update anywhere invalidates them all.
+    """
+    global user_cache
+    ttl = app.config.get("USER_CACHE_TTL", 60)
+    if app.config.get("USER_CACHE_BACKEND", "memory") == "sqlite":
+        path = app.config.get("USER_CACHE_PATH") or os.path.join(app.instance_path, "user_cache.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        user_cache = SQLiteCache(path, ttl=ttl)
+    else:
+        user_cache = TTLCache(maxsize=app.config.get("USER_CACHE_SIZE", 1024), ttl=ttl)
+
+
+def user_key(user_id):
+    return f"user:{user_id}"
+
+
+def load_cached_user(user_id):
+    """Return the ``User`` for ``user_id``, skipping the SELECT when cached.
+
+    The cache holds plain column values. On a hit they are merged into the
+    current session without loading, so the instance lives in this request's
+    identity map and behaves like a freshly queried row: relationships
+    lazy-load and changes are flushed on commit. ``UNCACHED_USER_COLUMNS``
+    are left unloaded and read from the database when first used.
+    """
+    data = user_cache.get(user_key(user_id))
+    if data is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            data = snapshot(user)
+            for column in UNCACHED_USER_COLUMNS:
+                del data[column]
+            user_cache.set(user_key(user_id), data)
+        return user
+
+    existing = db.session.identity_map.get(db.session.identity_key(User, user_id))
+    if existing is not None:
+        return existing
+    user = User(**data)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def invalidate_user(user_id):
+    user_cache.delete(user_key(user_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _track_changed_user(mapper, connection, target):
+    invalidate_user(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_users", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    # Drop the entries again once the change is visible, in case another
+    # request re-cached the old row between flush and commit.
+    for user_id in session.info.pop("changed_users", ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_users", None)
@@ -0,0 +1,252 @@
+import json
+import queue
+import threading
+from datetime import datetime
+
+from sqlalchemy import tuple_, union_all
+
+from app.extensions import db
+from app.models import Conversation, Message
+
+SYNC_LIMIT = 200
+THREAD_PAGE_SIZE = 50
+EXPORT_BATCH_SIZE = 500
+ADMIN_CHANNEL = 'admin'
+KEEPALIVE_SECONDS = 15
+
+
+def serialize_message(m):
+    return {
+        'id': m.id,
+        'from': m.sender_id,
+        'to': m.receiver_id,
+        'content': m.content,
+        'is_admin': m.is_admin,
+        'timestamp': m.timestamp.strftime("%Y-%m-%d %H:%M") if m.timestamp else None
+    }
+
+
+def parse_cursor(value):
+    """Turn a ``since`` query value into an ``(timestamp, id)`` cursor.
+
+    Accepts either a message id or an ISO timestamp. Returns ``None`` when
+    there is no usable cursor, meaning "start from the beginning".
+    """
+    if not value:
+        return None
+    if value.isdigit():
+        since_id = int(value)
+        row = db.session.query(Message.timestamp).filter(Message.id == since_id).first()
+        if row is None or row.timestamp is None:
+            return (None, since_id)
+        return (row.timestamp, since_id)
+    try:
+        return (datetime.fromisoformat(value), 0)
+    except ValueError:
+        return None
+
+
+def messages_since(user_id, cursor=None, limit=SYNC_LIMIT):
+    """Messages in ``user_id``'s conversation that come after ``cursor``.
+
+    Each side of the conversation is its own SELECT so SQLite can seek
+    straight into the (sender_id, timestamp) and (receiver_id, timestamp)
+    indexes instead of scanning the user's whole history.
+    """
+    sides = []
+    for column in (Message.sender_id, Message.receiver_id):
+        q = db.select(Message.id).where(column == user_id)
+        if cursor is not None:
+            ts, since_id = cursor
+            if ts is not None:
+                # Seek on the same (timestamp, id) order the page is sorted
+                # by; the plain >= keeps the index range tight.
+                q = q.where(Message.timestamp >= ts,
+                            tuple_(Message.timestamp, Message.id) > tuple_(ts, since_id))
+            else:
+                q = q.where(Message.id > since_id)
+        sides.append(q)
+
+    ids = union_all(*sides).subquery()
+    return Message.query.filter(Message.id.in_(db.select(ids.c.id)))\
+        .order_by(Message.timestamp, Message.id)\
+        .limit(limit)\
+        .all()
+
+
+
+def conversation_key(m):
+    """The non-admin participant a message belongs to."""
+    return m.receiver_id if m.is_admin else m.sender_id
+
+
+def upsert(model, values, index_elements, set_, dialect=None):
+    """``INSERT ... ON CONFLICT DO UPDATE`` for SQLite and PostgreSQL."""
+    if (dialect or db.engine.dialect.name) == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(model).values(**values)
+    return stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+
+
+def record_message(m):
+    """Fold a new ``Message`` into its ``Conversation`` summary row.
+
+    Call after ``db.session.add(m)`` and before the commit, so the message and
+    its summary land in the same transaction.
+    """
+    db.session.flush()
+    unread = 0 if m.is_admin else 1
+    db.session.execute(upsert(
+        Conversation,
+        dict(user_id=conversation_key(m), last_message_id=m.id, last_timestamp=m.timestamp,
+             message_count=1, unread_count=unread),
+        index_elements=[Conversation.user_id],
+        set_=dict(
+            last_message_id=m.id,
+            last_timestamp=m.timestamp,
+            message_count=Conversation.message_count + 1,
+            unread_count=0 if m.is_admin else Conversation.unread_count + 1,
+        ),
+    ))
+
+
+def conversation_messages(user_id, before=None, limit=THREAD_PAGE_SIZE):
+    """Latest messages of one conversation, newest ``limit`` before ``before``.
+
+    Returned oldest-first, ready to render.
+    """
+    sides = [
+        db.select(Message.id).where(Message.sender_id == user_id, Message.is_admin.is_(False)),
+        db.select(Message.id).where(Message.receiver_id == user_id, Message.is_admin.is_(True)),
+    ]
+    if before is not None:
+        sides = [q.where(Message.id < before) for q in sides]
+    ids = union_all(*sides).subquery()
+    messages = Message.query.filter(Message.id.in_(db.select(ids.c.id)))\
+        .order_by(Message.timestamp.desc(), Message.id.desc())\
+        .limit(limit)\
+        .all()
+    messages.reverse()
+    return messages
+
+
+def mark_read(user_id):
+    Conversation.query.filter_by(user_id=user_id).update({'unread_count': 0})
+
+
+
+def export_rows(after=0, limit=None):
+    """Plain rows of the Message table after id ``after``, fetched in batches.
+
+    Rows are read off a server-side cursor ``EXPORT_BATCH_SIZE`` at a time
+    rather than loaded into a list, and skip the ORM identity map entirely.
+    """
+    stmt = db.select(*Message.__table__.c).where(Message.id > after).order_by(Message.id)
+    if limit:
+        stmt = stmt.limit(limit)
+    return db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+
+def stream_json(rows, serialize, ndjson=False):
+    """Encode ``rows`` as a JSON array (or NDJSON) one batch at a time."""
+    buffer = []
+    first = True
+    if not ndjson:
+        yield '['
+    for row in rows:
+        item = json.dumps(serialize(row))
+        if ndjson:
+            buffer.append(item + '\n')
+        else:
+            buffer.append(item if first else ',' + item)
+            first = False
+        if len(buffer) >= EXPORT_BATCH_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+    if not ndjson:
+        yield ']'
+
+
+class ChatHub:
+    """In-process publish/subscribe fan-out for new chat messages.
+
+    Subscribers are keyed by user id (or ``ADMIN_CHANNEL``) and get their own
+    bounded queue. A subscriber that falls behind simply misses events; its
+    client reconnects with the last id it saw and catches up from the DB.
+    """
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, key):
+        q = queue.Queue(self.maxsize)
+        with self._lock:
+            self._subscribers.setdefault(key, set()).add(q)
+        return q
+
+    def unsubscribe(self, key, q):
+        with self._lock:
+            subs = self._subscribers.get(key)
+            if subs is not None:
+                subs.discard(q)
+                if not subs:
+                    del self._subscribers[key]
+
+    def publish(self, keys, payload):
+        with self._lock:
+            targets = [q for key in keys for q in self._subscribers.get(key, ())]
+        for q in targets:
+            try:
+                q.put_nowait(payload)
+            except queue.Full:
+                pass
+
+
+hub = ChatHub()
+
+
+def publish_message(m):
+    """Fan a committed ``Message`` out to both participants and the admins."""
+    hub.publish({m.sender_id, m.receiver_id, ADMIN_CHANNEL}, serialize_message(m))
+
+
+def format_event(payload):
+    return f"id: {payload['id']}\nevent: message\ndata: {json.dumps(payload)}\n\n"
+
+
+def event_stream(key, load_backlog, last_id=0):
+    """Yield SSE frames: the backlog first, then live events for ``key``.
+
+    The subscription is taken when the response starts, not in the view, so
+    a client that goes away before then leaves nothing behind. It comes
+    before ``load_backlog`` runs, so nothing committed in between is lost.
+    After the backlog the stream doesn't touch the database, so an idle
+    connection costs nothing but a keepalive comment every
+    ``KEEPALIVE_SECONDS``.
+    """
+    q = hub.subscribe(key)
+    try:
+        backlog = load_backlog()
+        # Hand the connection back to the pool for the rest of the stream.
+        db.session.close()
+        for payload in backlog:
+            last_id = max(last_id, payload['id'])
+            yield format_event(payload)
+        while True:
+            try:
+                payload = q.get(timeout=KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if payload['id'] <= last_id:
+                continue
+            last_id = payload['id']
+            yield format_event(payload)
+    finally:
+        hub.unsubscribe(key, q)
@@ -0,0 +1,91 @@
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, func
+
+from app.chat import upsert
+from app.extensions import db
+from app.models import Counter, Lead, Message, Order, Payment, Testimonial, Writer
+
+# Counter name -> model whose rows it counts.
+COUNTED_MODELS = {}
+
+counters_cli = AppGroup("counters", help="Maintain the materialized row counters.")
+
+
+def adjust(connection, name, delta):
+    """Add ``delta`` to counter ``name`` on ``connection``'s transaction."""
+    connection.execute(upsert(
+        Counter,
+        dict(name=name, value=delta),
+        index_elements=[Counter.name],
+        set_=dict(value=Counter.value + delta),
+        dialect=connection.dialect.name,
+    ))
+
+
+def adjust_model(connection, model, delta):
+    """``adjust`` whichever counter tracks ``model``, if any."""
+    for name, counted in COUNTED_MODELS.items():
+        if counted is model and delta:
+            adjust(connection, name, delta)
+
+
+def track(name, model):
+    """Keep counter ``name`` equal to the number of ``model`` rows.
+
+    Mapper events fire inside the flush, so the counter moves in the same
+    transaction as the row. Bulk statements (``insert()`` executemany,
+    ``Query.delete()``) skip mapper events; callers doing those should call
+    ``adjust_model`` themselves, and ``flask counters reconcile`` repairs any drift.
+    """
+    COUNTED_MODELS[name] = model
+
+    @event.listens_for(model, "after_insert")
+    def _inserted(mapper, connection, target):
+        adjust(connection, name, 1)
+
+    @event.listens_for(model, "after_delete")
+    def _deleted(mapper, connection, target):
+        adjust(connection, name, -1)
+
+
+track("messages", Message)
+track("testimonials", Testimonial)
+track("writers", Writer)
+track("leads", Lead)
+track("orders", Order)
+track("payments", Payment)
+
+
+def get_counters(*names):
+    """Current values of the named counters (all of them if none given)."""
+    names = names or tuple(COUNTED_MODELS)
+    values = dict(db.session.query(Counter.name, Counter.value).filter(Counter.name.in_(names)).all())
+    return {name: values.get(name, 0) for name in names}
+
+
+def reconcile():
+    """Recount every tracked table and overwrite the stored counters.
+
+    Returns ``{name: (old, new)}`` for the counters that had drifted.
+    """
+    drift = {}
+    stored = get_counters()
+    for name, model in COUNTED_MODELS.items():
+        actual = db.session.query(func.count()).select_from(model).scalar()
+        if actual != stored[name]:
+            drift[name] = (stored[name], actual)
+        db.session.execute(upsert(
+            Counter, dict(name=name, value=actual), index_elements=[Counter.name], set_=dict(value=actual)
+        ))
+    db.session.commit()
+    return drift
+
+
+@counters_cli.command("reconcile")
+def reconcile_command():
+    """Recount tracked tables and fix drifted counters."""
+    drift = reconcile()
+    for name, (old, new) in drift.items():
+        click.echo(f"{name}: {old} -> {new}")
+    click.echo(f"Reconciled {len(COUNTED_MODELS)} counters, {len(drift)} had drifted.")
@@ -1,6 +1,7 @@
-from wtforms.validators import DataRequired, Email, Length, EqualTo, Optional
+from datetime import date
+from wtforms.validators import DataRequired, Email, Length, EqualTo, Optional, NumberRange
 from flask_wtf import FlaskForm
-from wtforms import StringField, TextAreaField, DateField, PasswordField, SubmitField
+from wtforms import StringField, TextAreaField, DateField, PasswordField, SubmitField, IntegerField, SelectField
 from wtforms.validators import DataRequired, Email, EqualTo, Length
 from wtforms import StringField, PasswordField, SubmitField
 from wtforms.validators import DataRequired, Email, Optional
@@ -21,13 +22,19 @@ class LoginForm(FlaskForm):
     password = PasswordField('Password', validators=[DataRequired()])
     submit = SubmitField('Login')
 
+ACADEMIC_LEVELS = ["Undergrad", "Masters", "PhD"]
+
 class OrderForm(FlaskForm):
-    name = StringField('Name', validators=[DataRequired()])
-    email = StringField('Email', validators=[DataRequired(), Email()])
-    subject = StringField('Subject', validators=[DataRequired()])
-    details = TextAreaField('Details', validators=[DataRequired()])
+    topic = StringField('Topic', validators=[DataRequired(), Length(max=255)])
+    description = TextAreaField('Instructions', validators=[DataRequired()])
+    word_count = IntegerField('Word Count', validators=[DataRequired(), NumberRange(min=100, max=50000)])
+    level = SelectField('Academic Level', choices=ACADEMIC_LEVELS)
     deadline = DateField('Deadline', validators=[DataRequired()])
 
+    def validate_deadline(self, field):
+        if field.data < date.today():
+            raise ValidationError("The deadline can't be in the past.")
+
 class ProfileForm(FlaskForm):
     name = StringField("Full Name", validators=[Optional()])
     email = StringField("Email", validators=[DataRequired(), Email()])
@@ -0,0 +1,164 @@
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from flask import Response, abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds (or queries, for the query count histogram).
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class Histogram:
+    """A Prometheus histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.series = defaultdict(lambda: [[0] * len(buckets), 0, 0.0])  # counts, count, sum
+        self.lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.series[label_values]
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = [(key, list(counts), count, total) for key, (counts, count, total) in self.series.items()]
+        for key, counts, count, total in sorted(series):
+            pairs = [f'{name}="{value}"' for name, value in zip(self.labels, key)]
+            labels = "{%s}" % ",".join(pairs) if pairs else ""
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = ",".join(pairs + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            le = ",".join(pairs + ['le="+Inf"'])
+            lines.append(f"{self.name}_bucket{{{le}}} {count}")
+            lines.append(f"{self.name}_count{labels} {count}")
+            lines.append(f"{self.name}_sum{labels} {total}")
+        return "\n".join(lines)
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Wall time spent handling a request.",
+    ("endpoint", "method", "status"), LATENCY_BUCKETS,
+)
+request_queries = Histogram(
+    "http_request_sql_queries", "SQL statements executed while handling a request.",
+    ("endpoint", "method"), QUERY_COUNT_BUCKETS,
+)
+request_sql_duration = Histogram(
+    "http_request_sql_duration_seconds", "Time spent in SQL while handling a request.",
+    ("endpoint", "method"), LATENCY_BUCKETS,
+)
+write_buffer_flush_duration = Histogram(
+    "write_buffer_flush_duration_seconds", "Time to write one batch from the insert buffer.",
+    (), LATENCY_BUCKETS,
+)
+write_buffer_batch_rows = Histogram(
+    "write_buffer_batch_rows", "Rows written per insert buffer flush.",
+    (), BATCH_SIZE_BUCKETS,
+)
+HISTOGRAMS = [
+    request_duration, request_queries, request_sql_duration,
+    write_buffer_flush_duration, write_buffer_batch_rows,
+]
+
+
+def instrument_engine(engine, slow_query_seconds):
+    """Count and time every statement on ``engine``.
+
+    Per-request totals are kept on ``g``; statements slower than
+    ``slow_query_seconds`` are logged with their parameters.
+    """
+    # A connection runs one statement at a time, so a single start time is
+    # enough; a failed statement's is dropped by _error or overwritten.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        if context.connection is not None:
+            context.connection.info.pop("query_start", None)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info.pop("query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        if has_request_context() and "sql_queries" in g:
+            g.sql_queries += 1
+            g.sql_seconds += elapsed
+        if elapsed >= slow_query_seconds:
+            logger.warning("Slow query (%.1f ms): %s; parameters: %r", elapsed * 1000, statement, parameters)
+
+
+def start_timer():
+    g.request_start = time.perf_counter()
+    g.sql_queries = 0
+    g.sql_seconds = 0.0
+
+
+def record_request(response):
+    if "request_start" not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_start
+    endpoint = request.endpoint or "unmatched"
+    request_duration.observe((endpoint, request.method, str(response.status_code)), elapsed)
+    request_queries.observe((endpoint, request.method), g.sql_queries)
+    request_sql_duration.observe((endpoint, request.method), g.sql_seconds)
+
+    response.headers.add(
+        "Server-Timing",
+        f'app;dur={elapsed * 1000:.1f}, db;dur={g.sql_seconds * 1000:.1f};desc="{g.sql_queries} queries"',
+    )
+    if elapsed >= current_app.config["SLOW_REQUEST_SECONDS"]:
+        logger.warning(
+            "Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms",
+            request.method, request.path, endpoint, elapsed * 1000, g.sql_queries, g.sql_seconds * 1000,
+        )
+    return response
+
+
+def metrics():
+    """Prometheus text exposition of the request histograms.
+
+    Histograms are per process; with several workers, scrape each one or
+    aggregate in Prometheus by instance.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        abort(403)
+    body = "\n".join(h.render() for h in HISTOGRAMS) + "\n"
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app, engine):
+    """Register request timing, SQL instrumentation and the /metrics endpoint.
+
+    Call this before other ``before_request`` hooks that may short-circuit,
+    so that their responses are timed too.
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    instrument_engine(engine, app.config["SLOW_QUERY_SECONDS"])
+    app.before_request(start_timer)
+    app.after_request(record_request)
+    app.add_url_rule("/metrics", "metrics", metrics)
@@ -29,6 +29,7 @@ class Lead(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     topic = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=True)  # set once converted
 
 class Writer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -53,24 +54,35 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     name = db.Column(db.String(50), nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
     photo = db.Column(db.String(120), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # "user", "writer" or "admin"; set with `flask users set-role`.
+    role = db.Column(db.String(20), nullable=False, default="user", server_default="user")
     orders = db.relationship('Order', backref='user', lazy=True)
 
     def is_admin(self):
-        return hasattr(self, "role") and self.role == "admin"
+        return self.role == "admin"
 
     def is_writer(self):
-        return hasattr(self, "role") and self.role == "writer"
+        return self.role == "writer"
 
     def set_password(self, password):
-        from werkzeug.security import generate_password_hash
-        self.password_hash = generate_password_hash(password)
+        from app.passwords import password_hasher
+        self.password_hash = password_hasher().hash(password)
 
     def check_password(self, password):
-        from werkzeug.security import check_password_hash
-        return check_password_hash(self.password_hash, password)
+        """Verify ``password``, upgrading the stored hash if its parameters are stale.
+
+        The caller commits, so a rehash is saved along with the login.
+        """
+        from app.passwords import password_hasher
+        hasher = password_hasher()
+        if not hasher.verify(self.password_hash, password):
+            return False
+        if hasher.needs_rehash(self.password_hash):
+            self.password_hash = hasher.hash(password)
+        return True
      
 class Message(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -80,6 +92,29 @@ class Message(db.Model):
     is_admin = db.Column(db.Boolean, default=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_message_sender_id_timestamp', 'sender_id', 'timestamp'),
+        db.Index('ix_message_receiver_id_timestamp', 'receiver_id', 'timestamp'),
+    )
+
+class Conversation(db.Model):
+    # One row per chat thread, keyed by the non-admin participant. Kept up to
+    # date by app.chat.record_message so the admin inbox never scans Message.
+    user_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    last_message_id = db.Column(db.Integer, nullable=False)
+    last_timestamp = db.Column(db.DateTime, index=True)
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+
+    last_message = db.relationship(
+        'Message', primaryjoin='foreign(Conversation.last_message_id) == Message.id', lazy='joined'
+    )
+
+class Counter(db.Model):
+    # Running row counts, maintained by app.counters instead of COUNT(*).
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
 class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_name = db.Column(db.String(100))
@@ -101,6 +136,10 @@ class Announcement(db.Model):
     category = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_announcement_audience_created_at', 'audience', 'created_at'),
+    )
+
 class PublicPage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     slug = db.Column(db.String(50), unique=True, nullable=False)
@@ -115,10 +154,19 @@ class Order(db.Model):
     word_count = db.Column(db.Integer, nullable=False)
     level = db.Column(db.String(100), nullable=False)
     status = db.Column(db.String(50), default="Pending")
-    writer_id = db.Column(db.Integer, db.ForeignKey("writer.id"))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    price = db.Column(db.Float)
+    writer_id = db.Column(db.Integer, db.ForeignKey("writer.id"), index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
+    writer = db.relationship('Writer')
+    files = db.relationship('OrderFile', backref='order', order_by='OrderFile.uploaded_at')
+
+    __table_args__ = (
+        db.Index('ix_order_status_created_at', 'status', 'created_at'),
+        db.Index('ix_order_user_id_created_at', 'user_id', 'created_at'),
+    )
+
 def calculate_price(word_count, level, deadline):
     base_rate = 0.05
     urgency_multiplier = 2.0 if (deadline - datetime.utcnow()).days <= 1 else 1.0
@@ -130,13 +178,48 @@ class OrderFile(db.Model):
     filename = db.Column(db.String(255), nullable=False)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     uploader = db.Column(db.String(50))
-    order_id = db.Column(db.Integer, nullable=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=True, index=True)
+    stored_name = db.Column(db.String(255))  # name on disk: <sha256><ext>
+    content_hash = db.Column(db.String(64), index=True)
+    size = db.Column(db.Integer)
+
+class OutboundEmail(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    recipients = db.Column(db.Text, nullable=False)  # comma-separated
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sent or failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_outbound_email_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+class Task(db.Model):
+    # Background work queued by app.tasks and run by `flask tasks work`.
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON keyword arguments
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, running, done or failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_task_status_run_at', 'status', 'run_at'),
+    )
 
 class BlogPost(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
 class Sample(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -145,6 +228,10 @@ class Sample(db.Model):
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_sample_category_created_at', 'category', 'created_at'),
+    )
+
 class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -0,0 +1,76 @@
+from datetime import datetime, time
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Lead, Order, User, calculate_price
+from app.outbox import queue_email
+from app.tasks import enqueue, task
+
+
+def submit_order(user, topic, description, word_count, level, deadline, lead_id=None):
+    """Price and save a new order for ``user``, queueing its follow-up work.
+
+    The order and its ``order_submitted`` task are committed together, so the
+    request only pays for two inserts and a failed side effect can't lose an
+    order.
+    """
+    if not isinstance(deadline, datetime):
+        # Orders placed for a day are due at the end of it.
+        deadline = datetime.combine(deadline, time(23, 59))
+    order = Order(
+        user_id=user.id,
+        topic=topic,
+        description=description,
+        word_count=word_count,
+        level=level,
+        deadline=deadline,
+        price=round(calculate_price(word_count, level, deadline), 2),
+    )
+    db.session.add(order)
+    db.session.flush()
+    enqueue("order_submitted", order_id=order.id, lead_id=lead_id)
+    db.session.commit()
+    return order
+
+
+@task("order_submitted")
+def order_submitted(order_id, lead_id=None):
+    """Confirmation mail, admin notification and lead conversion for an order."""
+    order = db.session.get(Order, order_id)
+    if order is None:
+        return
+    user = db.session.get(User, order.user_id)
+
+    queue_email(
+        subject="✅ We Received Your Order",
+        recipients=[user.email],
+        body=f"""
+Hi {user.name},
+
+Thanks for your order!
+
+📌 Topic: {order.topic}
+📄 {order.word_count} words, {order.level}
+📅 Deadline: {order.deadline.strftime('%Y-%m-%d')}
+💵 Price: ${order.price:.2f}
+📝 Details: {order.description}
+
+We’ll get back to you shortly.
+
+Regards,
+Your Website Team
+""",
+    )
+
+    admin_email = current_app.config.get("ADMIN_EMAIL")
+    if admin_email:
+        queue_email(
+            subject=f"New order #{order.id}: {order.topic}",
+            recipients=[admin_email],
+            body=f"{user.name} <{user.email}> ordered {order.word_count} words ({order.level}) "
+                 f"due {order.deadline:%Y-%m-%d}, priced at ${order.price:.2f}.\n\n{order.description}",
+        )
+
+    if lead_id:
+        Lead.query.filter(Lead.id == lead_id, Lead.order_id.is_(None)).update({Lead.order_id: order.id})
@@ -0,0 +1,119 @@
+import smtplib
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from flask_mail import Message as MailMessage
+
+from app import mail
+from app.extensions import db
+from app.models import OutboundEmail
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+BATCH_SIZE = 50
+
+# Errors that concern a single message; anything else is treated as the
+# connection going away.
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+outbox_cli = AppGroup("outbox", help="Send queued outbound email.")
+
+
+def queue_email(subject, recipients, body):
+    """Add an email to the outbox as part of the caller's transaction.
+
+    Nothing talks to SMTP here; the row goes out with the caller's commit and
+    is delivered later by ``flask outbox work``.
+    """
+    email = OutboundEmail(subject=subject, recipients=",".join(recipients), body=body)
+    db.session.add(email)
+    return email
+
+
+def backoff(attempts):
+    return timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def mark_failed(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = "failed"
+    else:
+        email.next_attempt_at = now + backoff(email.attempts)
+
+
+def send_pending(batch_size=None):
+    """Deliver one batch of due emails over a single SMTP connection.
+
+    Each status change is committed as soon as the server has answered for
+    that message, so a worker killed mid-batch doesn't send the earlier
+    ones again. Returns ``(sent, failed)``. Meant to be run from a single
+    worker process.
+    """
+    batch_size = batch_size or current_app.config.get("MAIL_OUTBOX_BATCH_SIZE", BATCH_SIZE)
+    now = datetime.utcnow()
+    due = OutboundEmail.query.filter(
+        OutboundEmail.status == "pending",
+        OutboundEmail.next_attempt_at <= now
+    ).order_by(OutboundEmail.next_attempt_at, OutboundEmail.id).limit(batch_size).all()
+    if not due:
+        return 0, 0
+
+    sent = failed = 0
+    remaining = list(due)
+    try:
+        with mail.connect() as conn:
+            while remaining:
+                email = remaining[0]
+                msg = MailMessage(subject=email.subject, recipients=email.recipients.split(","), body=email.body)
+                try:
+                    conn.send(msg)
+                except MESSAGE_ERRORS as e:
+                    mark_failed(email, e, now)
+                    failed += 1
+                else:
+                    email.status = "sent"
+                    email.sent_at = datetime.utcnow()
+                    email.attempts += 1
+                    sent += 1
+                db.session.commit()
+                remaining.pop(0)
+    except (smtplib.SMTPException, OSError) as e:
+        # Could not connect, or the connection dropped: back off what is left.
+        for email in remaining:
+            mark_failed(email, e, now)
+            failed += 1
+        db.session.commit()
+    return sent, failed
+
+
+@outbox_cli.command("flush")
+@click.option("--batch-size", type=int, default=None)
+def flush_command(batch_size):
+    """Send everything that is currently due, then exit."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_pending(batch_size)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed == 0:
+            break
+    click.echo(f"Sent {total_sent}, failed {total_failed}.")
+
+
+@outbox_cli.command("work")
+@click.option("--interval", type=float, default=2.0, help="Seconds to sleep when the outbox is empty.")
+@click.option("--batch-size", type=int, default=None)
+def work_command(interval, batch_size):
+    """Keep draining the outbox until interrupted."""
+    while True:
+        sent, failed = send_pending(batch_size)
+        if sent or failed:
+            click.echo(f"Sent {sent}, failed {failed}.")
+        else:
+            db.session.remove()
+            time.sleep(interval)
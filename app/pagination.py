@@ -0,0 +1,111 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+NEXT = "n"
+PREV = "p"
+
+
+class KeysetPage:
+    """One page of a keyset (seek) paginated listing.
+
+    ``next_cursor`` and ``prev_cursor`` are opaque tokens for the older and
+    newer neighbouring pages, or ``None`` at either end.
+    """
+
+    def __init__(self, items, next_cursor, cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def map(self, func):
+        """The same page with ``func`` applied to each item, e.g. for caching."""
+        return KeysetPage([func(item) for item in self.items], self.next_cursor, self.cursor, self.prev_cursor)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(sort_value, row_id, direction=NEXT):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id, direction], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Inverse of ``encode_cursor``: ``(sort value, id, direction)``.
+
+    Returns ``None`` for a missing or malformed token, including one whose
+    values aren't a datetime or number and an integer id, so nothing else
+    reaches the query's bind parameters.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        sort_value, row_id, *rest = json.loads(raw)
+        direction = rest[0] if rest else NEXT
+        if direction not in (NEXT, PREV) or type(row_id) is not int:
+            return None
+        if isinstance(sort_value, str):
+            sort_value = datetime.fromisoformat(sort_value)
+        elif isinstance(sort_value, bool) or not isinstance(sort_value, (int, float)):
+            return None
+        return sort_value, row_id, direction
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, per_page=20):
+    """Newest-first page of ``query`` ordered by ``(sort_column, id_column)``.
+
+    Instead of OFFSET, each page seeks to rows strictly before (or, going
+    back, after) the cursor's ``(sort value, id)`` pair, so deep pages cost
+    the same as the first one. Filters on ``query`` should be equality
+    filters covered by the leading columns of an index ending in
+    ``sort_column``, e.g. ``(audience, created_at)``.
+    """
+    position = decode_cursor(cursor)
+    if position is None:
+        cursor = None
+        rows = query.order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1).all()
+        more = len(rows) > per_page
+        rows = rows[:per_page]
+        has_older, has_newer = more, False
+    else:
+        sort_value, row_id, direction = position
+        key = tuple_(sort_column, id_column)
+        if direction == NEXT:
+            rows = query.filter(key < tuple_(sort_value, row_id))\
+                .order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1).all()
+            more = len(rows) > per_page
+            rows = rows[:per_page]
+            has_older, has_newer = more, True
+        else:
+            rows = query.filter(key > tuple_(sort_value, row_id))\
+                .order_by(sort_column.asc(), id_column.asc()).limit(per_page + 1).all()
+            more = len(rows) > per_page
+            rows = rows[:per_page][::-1]
+            has_older, has_newer = True, more
+
+    def token(row, direction):
+        return encode_cursor(getattr(row, sort_column.key), getattr(row, id_column.key), direction)
+
+    next_cursor = token(rows[-1], NEXT) if rows and has_older else None
+    prev_cursor = token(rows[0], PREV) if rows and has_newer else None
+    return KeysetPage(rows, next_cursor, cursor, prev_cursor)
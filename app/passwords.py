@@ -0,0 +1,90 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+def canonical_method(method):
+    """``method`` with werkzeug's defaults filled in, as it writes them into hashes.
+
+    ``"scrypt"`` becomes ``"scrypt:32768:8:1"``, and ``"pbkdf2:sha256"``
+    becomes ``"pbkdf2:sha256:<DEFAULT_PBKDF2_ITERATIONS>"``. Raises
+    ``ValueError`` for anything werkzeug wouldn't accept.
+    """
+    name, *args = method.split(":")
+    try:
+        if name == "scrypt" and len(args) in (0, 3):
+            n, r, p = map(int, args) if args else (2**15, 8, 1)
+            return f"scrypt:{n}:{r}:{p}"
+        if name == "pbkdf2" and len(args) <= 2:
+            hash_name = args[0] if args else "sha256"
+            iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+            return f"pbkdf2:{hash_name}:{iterations}"
+    except ValueError:
+        pass
+    raise ValueError(f"Unsupported password hash method {method!r}")
+
+
+class PasswordHasher:
+    """Runs password hashes on a small dedicated thread pool.
+
+    scrypt and pbkdf2 release the GIL, so each hash occupies one core for its
+    whole run. Capping the pool at ``workers`` leaves the other cores to
+    render pages during a login burst. At most ``max_queue`` more hashes
+    may wait for a thread; past that callers get a 503 instead of queueing
+    without bound. With ``workers=0`` hashes run inline on the caller.
+    """
+
+    def __init__(self, method, workers=2, max_queue=32):
+        self.method = canonical_method(method)
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def _pool(self):
+        # A pool created before a fork has no threads in the child.
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            raise ServiceUnavailable("Too many sign-ins in progress, try again shortly.", retry_after=1)
+        try:
+            return self._pool().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when ``pwhash`` was made with other parameters than ``method``."""
+        try:
+            return canonical_method(pwhash.split("$", 1)[0]) != self.method
+        except ValueError:
+            return True
+
+
+def init_password_hasher(app):
+    app.extensions["password_hasher"] = PasswordHasher(
+        app.config["PASSWORD_HASH_METHOD"],
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        max_queue=app.config["PASSWORD_HASH_MAX_QUEUE"],
+    )
+
+
+def password_hasher():
+    return current_app.extensions["password_hasher"]
@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import click
+from flask import current_app, request, send_file, session, url_for
+from flask.cli import AppGroup
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip variants are built without it
+    brotli = None
+
+# Company and service pages whose output only depends on current_year.
+STATIC_ENDPOINTS = [
+    "main.about", "main.testimonials", "main.privacy_policy", "main.faq", "main.how_it_works",
+    "main.hiring", "main.terms", "main.fair_use", "main.payment_policy", "main.dont_buy_accounts",
+    "main.essay_writing", "main.research_papers", "main.case_studies", "main.dissertations",
+    "main.theses", "main.speeches", "main.assignments", "main.narrative_essays",
+    "main.analytical_essays", "main.persuasive_essays", "main.admission_help",
+    "main.literature_reviews", "main.book_reports",
+]
+
+ENCODINGS = [("br", ".br"), ("gzip", ".gz"), (None, "")]
+
+prerender_cli = AppGroup("prerender", help="Pre-render static marketing pages.")
+
+
+def output_dir(app):
+    return app.config.get("PRERENDER_DIR") or os.path.join(app.instance_path, "prerendered")
+
+
+def load_manifest(app):
+    path = os.path.join(output_dir(app), "manifest.json")
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    # Pages embed current_year; a build from last year is stale.
+    if manifest.get("year") != datetime.now().year:
+        manifest = {}
+    app.extensions["prerendered"] = manifest.get("pages", {})
+    return manifest
+
+
+def serve_prerendered():
+    """Answer GETs for pre-rendered pages from disk, with conditional GET.
+
+    Only anonymous visitors get the pre-rendered copy; the navbar shows the
+    logged-in user, so signed-in requests fall through to the view.
+    """
+    if request.method not in ("GET", "HEAD") or "_user_id" in session:
+        return None
+    page = current_app.extensions.get("prerendered", {}).get(request.endpoint)
+    if page is None:
+        return None
+
+    accepted = request.accept_encodings
+    for encoding, suffix in ENCODINGS:
+        if encoding is None or (encoding in page["encodings"] and accepted[encoding]):
+            break
+    path = os.path.join(output_dir(current_app), page["file"] + suffix)
+    response = send_file(path, mimetype="text/html", etag=False, conditional=False)
+    response.charset = "utf-8"
+    response.set_etag(page["etag"] + ("-" + encoding if encoding else ""))
+    response.last_modified = datetime.fromtimestamp(page["built_at"], timezone.utc)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get("PRERENDER_MAX_AGE", 300)
+    response.vary.update(("Accept-Encoding", "Cookie"))
+    if encoding:
+        response.content_encoding = encoding
+    return response.make_conditional(request)
+
+
+def init_prerender(app):
+    load_manifest(app)
+    app.before_request(serve_prerendered)
+    app.cli.add_command(prerender_cli)
+
+
+@prerender_cli.command("build")
+def build_command():
+    """Render every STATIC_ENDPOINTS page to instance/prerendered."""
+    app = current_app._get_current_object()
+    target = output_dir(app)
+    os.makedirs(target, exist_ok=True)
+    # Render through the real views, not stale copies from a previous build.
+    app.extensions["prerendered"] = {}
+
+    pages = {}
+    built_at = int(datetime.now(timezone.utc).timestamp())
+    client = app.test_client()
+    for endpoint in STATIC_ENDPOINTS:
+        with app.test_request_context():
+            url = url_for(endpoint)
+        response = client.get(url)
+        if response.status_code != 200:
+            click.echo(f"Skipping {endpoint}: {url} returned {response.status_code}", err=True)
+            continue
+
+        html = response.get_data()
+        name = endpoint.split(".", 1)[1] + ".html"
+        variants = {None: html, "gzip": gzip.compress(html, 9)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(html)
+        for encoding, suffix in ENCODINGS:
+            if encoding in variants:
+                with open(os.path.join(target, name + suffix), "wb") as f:
+                    f.write(variants[encoding])
+
+        pages[endpoint] = {
+            "file": name,
+            "etag": hashlib.sha256(html).hexdigest()[:32],
+            "built_at": built_at,
+            "encodings": [e for e in variants if e],
+        }
+        click.echo(f"Rendered {url}")
+
+    with open(os.path.join(target, "manifest.json"), "w") as f:
+        json.dump({"year": datetime.now().year, "pages": pages}, f, indent=2)
+    load_manifest(app)
+    click.echo(f"Pre-rendered {len(pages)} of {len(STATIC_ENDPOINTS)} pages into {target}")
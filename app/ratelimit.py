@@ -0,0 +1,188 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request
+from flask_login import current_user
+from werkzeug.exceptions import ServiceUnavailable, TooManyRequests
+
+logger = logging.getLogger(__name__)
+
+
+def refill(tokens, updated, now, capacity, rate):
+    """Take one token from a bucket last seen at ``updated`` holding ``tokens``.
+
+    Returns the new token count and how many seconds the caller must wait,
+    0 when the request may proceed.
+    """
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBuckets:
+    """Token buckets held in this process, least recently used dropped first.
+
+    A dropped bucket comes back full, which is what an idle one would have
+    refilled to anyway.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._data.get(key, (capacity, now))
+            tokens, wait = refill(tokens, updated, now, capacity, rate)
+            self._data[key] = (tokens, now)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteBuckets:
+    """The same interface as ``MemoryBuckets``, backed by a SQLite file.
+
+    Worker processes on one box then share their limits, so a client can't
+    multiply its allowance by the number of workers.
+    """
+
+    # Buckets idle this long are full again and can be deleted.
+    EXPIRE_SECONDS = 3600
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, capacity, rate):
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM bucket WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens, wait = refill(tokens, updated, now, capacity, rate)
+            conn.execute("INSERT OR REPLACE INTO bucket (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                conn.execute("DELETE FROM bucket WHERE updated < ?", (now - self.EXPIRE_SECONDS,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def clear(self):
+        self._connect().execute("DELETE FROM bucket")
+
+
+class AdmissionGate:
+    """Caps how many limited requests this process works on at once.
+
+    Extra requests wait up to ``timeout`` seconds for a slot and are then
+    turned away, so a burst queues in front of the database instead of
+    inside it.
+    """
+
+    def __init__(self, max_concurrent, timeout):
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+
+    def acquire(self):
+        return self._slots.acquire(timeout=self.timeout)
+
+    def release(self):
+        self._slots.release()
+
+
+def init_rate_limits(app):
+    if app.config.get("RATE_LIMIT_BACKEND", "memory") == "sqlite":
+        path = app.config.get("RATE_LIMIT_PATH") or os.path.join(app.instance_path, "ratelimit.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        buckets = SQLiteBuckets(path)
+    else:
+        buckets = MemoryBuckets()
+    app.extensions["rate_limit"] = buckets
+    app.extensions["admission_gate"] = AdmissionGate(
+        app.config["ADMISSION_MAX_CONCURRENT"], app.config["ADMISSION_QUEUE_TIMEOUT"]
+    )
+
+
+def client_identities(name, account=None):
+    """``(scope, bucket key)`` pairs that a request to limit ``name`` draws from.
+
+    Every request spends from its IP's bucket; signed-in users, or requests
+    naming an ``account`` such as a login email, also from that identity's.
+    Behind a reverse proxy, wrap the app in werkzeug's ``ProxyFix`` so
+    ``remote_addr`` is the client rather than the proxy.
+    """
+    identities = [("ip", f"{name}:ip:{request.remote_addr}")]
+    identity = account() if account else None
+    if not identity and current_user.is_authenticated:
+        identity = current_user.get_id()
+    if identity:
+        identities.append(("user", f"{name}:user:{identity}"))
+    return identities
+
+
+def rate_limit(name, account=None):
+    """Limit POSTs to the decorated view by the ``RATE_LIMITS[name]`` buckets.
+
+    Over the limit, the request gets a 429 with ``Retry-After``; with every
+    admission slot busy, a 503. Both happen before the view runs, so shed
+    requests never reach the database.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != "POST" or not current_app.config.get("RATE_LIMIT_ENABLED", True):
+                return view(*args, **kwargs)
+
+            limits = current_app.config["RATE_LIMITS"][name]
+            buckets = current_app.extensions["rate_limit"]
+            wait = 0.0
+            for scope, key in client_identities(name, account):
+                if scope in limits:
+                    capacity, period = limits[scope]
+                    wait = max(wait, buckets.take(key, capacity, capacity / period))
+            if wait:
+                logger.info("Rate limited %s for %s", name, request.remote_addr)
+                raise TooManyRequests(retry_after=math.ceil(wait))
+
+            gate = current_app.extensions["admission_gate"]
+            if not gate.acquire():
+                logger.warning("Shed %s: no admission slot free", name)
+                raise ServiceUnavailable(retry_after=1)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                gate.release()
+        return wrapper
+    return decorator
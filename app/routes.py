@@ -1,34 +1,71 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, abort
+from flask import (
+    Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, abort, Response,
+    session, stream_with_context
+)
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from datetime import datetime
+from sqlalchemy.orm import joinedload, selectinload
+from datetime import datetime, timedelta
 import os
+import queue
 
 from app.extensions import db, login_manager
 from app.forms import OrderForm, RegistrationForm, LoginForm, ProfileForm, SettingForm, ApplicationForm
 from app.models import (
     BlogPost, Sample, User, Testimonial, Lead, Writer, SiteReview, ChatMessage, Message,
-    Announcement, Order, OrderFile, Application
+    Announcement, Order, OrderFile, Application, Conversation
+)
+from app.bulk import bulk_delete, bulk_import, bulk_update, parse_ids, read_rows
+from app.cache import cached, invalidate, snapshot
+from app.counters import get_counters
+from app.orders import submit_order
+from app.pagination import keyset_paginate
+from app.ratelimit import rate_limit
+from app.search import order_search_filter, search_blog_posts
+from app.write_buffer import buffered_insert
+from app.uploads import (
+    append_chunk, finish_resumable, resumable_status, send_stored_file, start_resumable, store_stream
+)
+from app.chat import (
+    ADMIN_CHANNEL, SYNC_LIMIT, conversation_messages, event_stream, export_rows, hub, mark_read,
+    messages_since, parse_cursor, publish_message, record_message, serialize_message, stream_json
 )
-from flask_mail import Message as MailMessage
-from app import mail
 
 main = Blueprint("main", __name__)
 
+ANNOUNCEMENTS_PER_PAGE = 5
+ANNOUNCEMENT_AUDIENCES = ("public", "writers")
+BLOG_PER_PAGE = 5
+SAMPLES_PER_PAGE = 10
+ADMIN_SAMPLES_PER_PAGE = 20
+
 @main.route("/")
 def index():
-    page = request.args.get("page", 1, type=int)
+    cursor = request.args.get("cursor")
     category = request.args.get("category", "public")
-    writers = Application.query.filter_by(approved=True).all()
-
-    announcements = Announcement.query.filter_by(audience=category)\
-        .order_by(Announcement.created_at.desc())\
-        .paginate(page=page, per_page=5)
+    if category not in ANNOUNCEMENT_AUDIENCES:
+        # Also keeps arbitrary values out of the page cache keys.
+        category = "public"
+
+    # These only change when an admin posts, so they are served from the page
+    # cache and dropped by the admin views that modify them. Only the first
+    # page is cached; deeper pages are a cheap index seek anyway.
+    def announcement_page():
+        return keyset_paginate(
+            Announcement.query.filter_by(audience=category), Announcement.created_at, Announcement.id,
+            cursor=cursor, per_page=ANNOUNCEMENTS_PER_PAGE
+        ).map(snapshot)
+    if cursor:
+        announcements = announcement_page()
+    else:
+        announcements = cached(f"index:announcements:{category}", announcement_page)
+    writers = cached("index:writers", lambda: [
+        snapshot(w) for w in Writer.query.order_by(Writer.created_at.desc()).limit(4).all()
+    ])
+    posts = cached("index:posts", lambda: [
+        snapshot(p) for p in BlogPost.query.order_by(BlogPost.created_at.desc()).limit(3).all()
+    ])
 
-    writers = Writer.query.order_by(Writer.created_at.desc()).limit(4).all()
-    posts = BlogPost.query.order_by(BlogPost.created_at.desc()).limit(3).all()
- 
     return render_template(
         "index.html",
         announcements=announcements,
@@ -38,32 +75,58 @@ def index():
     )
 
 @main.route('/lead', methods=['POST'])
+@rate_limit('lead')
 def lead():
     topic = request.form.get('topic')
-    new_lead = Lead(topic=topic)
-    db.session.add(new_lead)
-    db.session.commit()
+    new_lead = buffered_insert(Lead, dict(topic=topic), stamp='created_at')
+    if new_lead is not None:
+        # Linked to the visitor's order if they go on to place one.
+        session['lead_id'] = new_lead.id
     return redirect(url_for('main.index'))
 
-UPLOAD_FOLDER = os.path.join(os.getcwd(), 'app', 'static', 'uploads')
+# Files uploaded before downloads went through download_order_file.
+LEGACY_UPLOAD_FOLDER = os.path.join(os.getcwd(), 'app', 'static', 'uploads')
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt', 'png', 'jpg'}
 
+# Resumable uploads are sent in pieces of this size; each piece must fit
+# under MAX_CONTENT_LENGTH.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+def bulk_done(message, endpoint, count):
+    if request.is_json:
+        return jsonify({'count': count})
+    flash(message, 'info')
+    return redirect(url_for(endpoint))
+
+def upload_folder():
+    return current_app.config['UPLOAD_FOLDER'] or os.path.join(current_app.instance_path, 'uploads')
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def get_grouped_chats():
-    chats = Message.query.order_by(Message.timestamp.asc()).all()
-    grouped = {}
-    for msg in chats:
-        grouped.setdefault(msg.sender_id, []).append(msg)
-    return grouped
+INBOX_PAGE_SIZE = 20
+
+def login_account():
+    """The login bucket key: the email being tried, from this client only.
+
+    Keyed on the email alone, anyone could lock a user out by failing their
+    login five times; spraying many emails from one address is caught by
+    the IP bucket instead.
+    """
+    email = (request.form.get('email') or '').strip().lower()
+    return f"{email}|{request.remote_addr}" if email else None
+
+def get_grouped_chats(page=1, per_page=INBOX_PAGE_SIZE):
+    return Conversation.query.order_by(Conversation.last_timestamp.desc())\
+        .paginate(page=page, per_page=per_page, error_out=False)
 
 @main.route('/Register now', methods=['GET', 'POST'])
+@rate_limit('register')
 def register():
     form = RegistrationForm()
     if form.validate_on_submit():
-        hashed_pw = generate_password_hash(form.password.data)
-        user = User(email=form.email.data, name=form.name.data, password=hashed_pw)
+        user = User(email=form.email.data, name=form.name.data)
+        user.set_password(form.password.data)
         db.session.add(user)
         db.session.commit()
         flash('Account created successfully! Please log in.', 'success')
@@ -72,33 +135,122 @@ def register():
 
 @main.route('/send_message', methods=['POST'])
 @login_required
+@rate_limit('send_message')
 def send_message():
     data = request.get_json()
     content = data.get('message')
     if not content:
         return jsonify({'error': 'Empty message'}), 400
 
-    msg = Message(sender_id=current_user.id, receiver_id=0, content=content)
+    # Written straight away rather than through the write buffer, so the
+    # sender's next sync already includes it.
+    msg = Message(sender_id=current_user.id, receiver_id=0, content=content, timestamp=datetime.utcnow())
     db.session.add(msg)
+    record_message(msg)
     db.session.commit()
+    publish_message(msg)
     return jsonify({'status': 'Message sent'})
 
 @main.route('/get_messages', methods=['GET'])
 @login_required
 def get_messages():
-    messages = Message.query.filter(
-        (Message.sender_id == current_user.id) | 
-        (Message.receiver_id == current_user.id)
-    ).order_by(Message.timestamp).all()
-    return jsonify([
-        {
-            'content': m.content,
-            'is_admin': m.is_admin,
-            'timestamp': m.timestamp.strftime("%Y-%m-%d %H:%M") if m.timestamp else None
-        } for m in messages
-    ])
+    cursor = parse_cursor(request.args.get('since', ''))
+    if cursor is not None:
+        messages = messages_since(current_user.id, cursor)
+    else:
+        messages = Message.query.filter(
+            (Message.sender_id == current_user.id) | 
+            (Message.receiver_id == current_user.id)
+        ).order_by(Message.timestamp).all()
+    return jsonify([serialize_message(m) for m in messages])
+
+@main.route('/chat/sync', methods=['GET'])
+@login_required
+def chat_sync():
+    since = request.args.get('since', '')
+    limit = max(1, min(request.args.get('limit', SYNC_LIMIT, type=int), SYNC_LIMIT))
+    messages = messages_since(current_user.id, parse_cursor(since), limit=limit)
+    cursor = messages[-1].id if messages else (int(since) if since.isdigit() else since or None)
+    return jsonify({
+        'messages': [serialize_message(m) for m in messages],
+        'cursor': cursor,
+        'has_more': len(messages) == limit
+    })
+
+LONG_POLL_SECONDS = 25
+
+def sse_response(stream):
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@main.route('/chat/stream', methods=['GET'])
+@login_required
+def chat_stream():
+    user_id = current_user.id
+    since = request.headers.get('Last-Event-ID') or request.args.get('since', '')
+
+    def backlog():
+        cursor = parse_cursor(since)
+        payloads = []
+        while True:
+            page = messages_since(user_id, cursor, limit=SYNC_LIMIT)
+            payloads.extend(serialize_message(m) for m in page)
+            if len(page) < SYNC_LIMIT:
+                return payloads
+            cursor = (page[-1].timestamp, page[-1].id)
+
+    last_id = int(since) if since.isdigit() else 0
+    return sse_response(stream_with_context(event_stream(user_id, backlog, last_id)))
+
+@main.route('/admin/chat/stream', methods=['GET'])
+@login_required
+def admin_chat_stream():
+    if not current_user.is_admin():
+        abort(403)
+    since = request.headers.get('Last-Event-ID') or request.args.get('since', '')
+    last_id = int(since) if since.isdigit() else 0
+
+    def backlog():
+        if not since.isdigit():
+            return []
+        payloads = []
+        after = last_id
+        while True:
+            page = Message.query.filter(Message.id > after).order_by(Message.id).limit(SYNC_LIMIT).all()
+            payloads.extend(serialize_message(m) for m in page)
+            if len(page) < SYNC_LIMIT:
+                return payloads
+            after = page[-1].id
+
+    return sse_response(stream_with_context(event_stream(ADMIN_CHANNEL, backlog, last_id)))
+
+@main.route('/chat/poll', methods=['GET'])
+@login_required
+def chat_poll():
+    """Long-poll fallback for clients without EventSource support."""
+    user_id = current_user.id
+    since = request.args.get('since', '')
+    q = hub.subscribe(user_id)
+    try:
+        payloads = [serialize_message(m) for m in messages_since(user_id, parse_cursor(since))]
+        if not payloads:
+            # Hand the connection back to the pool while we wait.
+            db.session.close()
+            try:
+                payloads.append(q.get(timeout=LONG_POLL_SECONDS))
+                while True:
+                    payloads.append(q.get_nowait())
+            except queue.Empty:
+                pass
+    finally:
+        hub.unsubscribe(user_id, q)
+    cursor = payloads[-1]['id'] if payloads else (int(since) if since.isdigit() else since or None)
+    return jsonify({'messages': payloads, 'cursor': cursor, 'has_more': len(payloads) >= SYNC_LIMIT})
 
 @main.route("/login", methods=["GET", "POST"])
+@rate_limit("login", account=login_account)
 def login():
     if current_user.is_authenticated:
         return redirect(url_for("main.index"))
@@ -106,7 +258,8 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data).first()
-        if user and check_password_hash(user.password, form.password.data):
+        if user and user.check_password(form.password.data):
+            db.session.commit()
             login_user(user)
             next_page = request.args.get("next")
             return redirect(next_page) if next_page else redirect(url_for("main.index"))
@@ -148,29 +301,24 @@ def blog_list():
     query = request.args.get("q", "")
     page = request.args.get("page", 1, type=int)
 
-    blogs = BlogPost.query
+    # Search results are ranked by relevance, so they keep page numbers;
+    # the plain listing is newest first and pages by cursor.
     if query:
-        blogs = blogs.filter(BlogPost.title.contains(query))
-
-    blogs = blogs.order_by(BlogPost.created_at.desc()).paginate(page=page, per_page=5)
-    return render_template("Blog.html", blogs=blogs, query=query)
+        blogs = search_blog_posts(query, page=page, per_page=BLOG_PER_PAGE)
+    else:
+        blogs = keyset_paginate(BlogPost.query, BlogPost.created_at, BlogPost.id,
+                                cursor=request.args.get("cursor"), per_page=BLOG_PER_PAGE)
+    return render_template("blog.html", blogs=blogs, query=query)
 
 @main.route('/admin')
 def admin_dashboard():
-    stats = {
-        "messages": Message.query.count(),
-        "testimonials": Testimonial.query.count(),
-        "writers": Writer.query.count(),
-        "leads": Lead.query.count(),
-    }
-
-    grouped_chats = get_grouped_chats()
+    stats = get_counters()
+
     announcements = Announcement.query.order_by(Announcement.created_at.desc()).limit(5).all()
 
     return render_template(
         "admin_dashboard.html",
         stats=stats,
-        grouped_chats=grouped_chats,
         announcements=announcements
     )
     
@@ -211,6 +359,14 @@ def delete_testimonial(id):
     db.session.commit()
     return redirect(url_for('main.admin_testimonials'))
 
+@main.route('/admin/testimonials/bulk-delete', methods=['POST'])
+@login_required
+def bulk_delete_testimonials():
+    if not current_user.is_admin():
+        abort(403)
+    count = bulk_delete(Testimonial, parse_ids(request))
+    return bulk_done(f'{count} testimonials deleted.', 'main.admin_testimonials', count)
+
 @main.route("/admin/samples", methods=["GET", "POST"])
 def admin_samples():
     if request.method == "POST":
@@ -222,7 +378,8 @@ def admin_samples():
         db.session.commit()
         return redirect(url_for("main.admin_samples"))
 
-    samples = Sample.query.order_by(Sample.created_at.desc()).all()
+    samples = keyset_paginate(Sample.query, Sample.created_at, Sample.id,
+                              cursor=request.args.get("cursor"), per_page=ADMIN_SAMPLES_PER_PAGE)
     return render_template("admin_samples.html", samples=samples)
 
 @main.route('/admin/samples/<int:id>/delete')
@@ -233,6 +390,24 @@ def delete_samples(id):
     flash('Sample post deleted.', 'info')
     return redirect(url_for('main.admin_samples'))
 
+@main.route('/admin/samples/bulk-delete', methods=['POST'])
+@login_required
+def bulk_delete_samples():
+    if not current_user.is_admin():
+        abort(403)
+    count = bulk_delete(Sample, parse_ids(request))
+    return bulk_done(f'{count} samples deleted.', 'main.admin_samples', count)
+
+@main.route('/admin/samples/import', methods=['POST'])
+@login_required
+def import_samples():
+    if not current_user.is_admin():
+        abort(403)
+    rows = read_rows(request.files['file'])
+    count = bulk_import(Sample, rows, required=('title', 'category', 'content'), optional=('created_at',),
+                        converters={'created_at': datetime.fromisoformat})
+    return bulk_done(f'{count} samples imported.', 'main.admin_samples', count)
+
 @main.route('/admin/reviews', methods=['GET', 'POST'])
 def admin_reviews():
     if request.method == 'POST':
@@ -255,6 +430,14 @@ def delete_review(id):
     db.session.commit()
     return redirect(url_for('main.admin_reviews'))
 
+@main.route('/admin/reviews/bulk-delete', methods=['POST'])
+@login_required
+def bulk_delete_reviews():
+    if not current_user.is_admin():
+        abort(403)
+    count = bulk_delete(SiteReview, parse_ids(request))
+    return bulk_done(f'{count} reviews deleted.', 'main.admin_reviews', count)
+
 @main.route('/admin/writers')
 def admin_writers():
     writers = Writer.query.order_by(Writer.created_at.desc()).all()
@@ -265,6 +448,7 @@ def approve_writer(id):
     writer = Writer.query.get_or_404(id)
     writer.approved = True
     db.session.commit()
+    invalidate("index:writers")
     flash('Writer approved!', 'success')
     return redirect(url_for('main.admin_writers'))
 
@@ -273,9 +457,28 @@ def delete_writer(id):
     writer = Writer.query.get_or_404(id)
     db.session.delete(writer)
     db.session.commit()
+    invalidate("index:writers")
     flash('Writer deleted.', 'info')
     return redirect(url_for('main.admin_writers'))
 
+@main.route('/admin/writers/bulk-approve', methods=['POST'])
+@login_required
+def bulk_approve_writers():
+    if not current_user.is_admin():
+        abort(403)
+    count = bulk_update(Writer, parse_ids(request), {Writer.approved: True})
+    invalidate("index:writers")
+    return bulk_done(f'{count} writers approved.', 'main.admin_writers', count)
+
+@main.route('/admin/writers/bulk-delete', methods=['POST'])
+@login_required
+def bulk_delete_writers():
+    if not current_user.is_admin():
+        abort(403)
+    count = bulk_delete(Writer, parse_ids(request))
+    invalidate("index:writers")
+    return bulk_done(f'{count} writers deleted.', 'main.admin_writers', count)
+
 @main.route('/writer/thanks')
 def writer_thank_you():
     return render_template('writer_thank_you.html')
@@ -291,6 +494,7 @@ def add_writer():
         new_writer = Writer(name=name, subject=subject, image_url=image_url, approved=approved)
         db.session.add(new_writer)
         db.session.commit()
+        invalidate("index:writers")
         flash("Writer added successfully.", "success")
         return redirect(url_for('main.admin_writers'))
     return render_template('admin_writer_add.html')
@@ -300,38 +504,16 @@ def add_writer():
 def order():
     form = OrderForm()
     if form.validate_on_submit():
-        order = Order(
-            name=form.name.data,
-            email=form.email.data,
-            subject=form.subject.data,
-            details=form.details.data,
-            deadline=form.deadline.data
-        )
-        db.session.add(order)
-        db.session.commit()
-
-        # Send email
-        msg = MailMessage(
-            subject="✅ We Received Your Order",
-            recipients=[form.email.data],
-            body=f"""
-Hi {form.name.data},
-
-Thanks for your order!
-
-📌 Subject: {form.subject.data}
-📅 Deadline: {form.deadline.data.strftime('%Y-%m-%d')}
-📝 Details: {form.details.data}
-
-We’ll get back to you shortly.
-
-Regards,
-Your Website Team
-""",
+        submit_order(
+            current_user,
+            topic=form.topic.data,
+            description=form.description.data,
+            word_count=form.word_count.data,
+            level=form.level.data,
+            deadline=form.deadline.data,
+            lead_id=session.pop('lead_id', None),
         )
-        mail.send(msg)
-
-        flash("Order submitted successfully! A confirmation email has been sent.", "success")
+        flash("Order submitted successfully! A confirmation email is on its way.", "success")
         return redirect(url_for("main.order_confirmation"))
 
     return render_template("order.html", form=form)
@@ -340,16 +522,35 @@ Your Website Team
 def order_confirmation():
     return render_template("order_confirmation.html")
 
+ORDERS_PER_PAGE = 25
+ORDER_STATUSES = ["Pending", "In Progress", "Completed", "Cancelled"]
+
 @main.route("/admin/orders")
 def admin_orders():
-    q = request.args.get("q")
+    q = request.args.get("q", "")
+    status = request.args.get("status", "")
+    date_from = request.args.get("from", "")
+    date_to = request.args.get("to", "")
+
+    orders = Order.query.options(joinedload(Order.user), joinedload(Order.writer))
     if q:
-        orders = Order.query.filter(
-            (Order.name.ilike(f"%{q}%")) | (Order.subject.ilike(f"%{q}%"))
-        ).order_by(Order.created_at.desc()).all()
-    else:
-        orders = Order.query.order_by(Order.created_at.desc()).all()
-    return render_template("admin_orders.html", orders=orders)
+        match = order_search_filter(q)
+        if match is not None:
+            orders = orders.filter(match)
+    if status:
+        orders = orders.filter(Order.status == status)
+    try:
+        if date_from:
+            orders = orders.filter(Order.created_at >= datetime.fromisoformat(date_from))
+        if date_to:
+            orders = orders.filter(Order.created_at < datetime.fromisoformat(date_to) + timedelta(days=1))
+    except ValueError:
+        flash("Dates must be in YYYY-MM-DD format.", "warning")
+
+    page = keyset_paginate(orders, Order.created_at, Order.id,
+                           cursor=request.args.get("cursor"), per_page=ORDERS_PER_PAGE)
+    return render_template("admin_orders.html", orders=page, q=q, status=status,
+                           date_from=date_from, date_to=date_to, statuses=ORDER_STATUSES)
 
 @main.route('/admin/order/<int:id>/update', methods=['GET', 'POST'])
 def update_order(id):
@@ -369,25 +570,42 @@ def delete_order(id):
     return redirect(url_for("main.admin_orders"))
 
 @main.route('/contact', methods=['POST'])
+@rate_limit('contact')
 def contact():
     message = request.form.get('message')
     name = request.form.get('name')
     email = request.form.get('email')
     # Choose how to associate sender/receiver. Here, sender_id=0 (guest), receiver_id=1 (admin)
-    new_msg = Message(
-        sender_id=0,
-        receiver_id=1,
-        content=message,
-        is_admin=False
-    )
-    db.session.add(new_msg)
+    msg = Message(sender_id=0, receiver_id=1, content=message, is_admin=False, timestamp=datetime.utcnow())
+    db.session.add(msg)
+    record_message(msg)
     db.session.commit()
+    publish_message(msg)
     return redirect(url_for('main.index', success=True))
 
 @main.route('/admin/chat/grouped')
 def admin_chat_grouped():
-    grouped_chats = get_grouped_chats()
-    return render_template('admin_chat_grouped.html', grouped_chats=grouped_chats)
+    page = request.args.get('page', 1, type=int)
+    pagination = get_grouped_chats(page=page)
+    return render_template('admin_chat_grouped.html', conversations=pagination.items, pagination=pagination)
+
+@main.route('/admin/chat/<int:user_id>/messages')
+@login_required
+def admin_conversation(user_id):
+    if not current_user.is_admin():
+        abort(403)
+    before = request.args.get('before', type=int)
+    messages = conversation_messages(user_id, before=before)
+    return jsonify([serialize_message(m) for m in messages])
+
+@main.route('/admin/chat/<int:user_id>/read', methods=['POST'])
+@login_required
+def mark_conversation_read(user_id):
+    if not current_user.is_admin():
+        abort(403)
+    mark_read(user_id)
+    db.session.commit()
+    return '', 204
 
 @main.route('/admin/chat/reply', methods=['POST'])
 def reply_to_user():
@@ -401,19 +619,41 @@ def reply_to_user():
         is_admin=True
     )
     db.session.add(msg)
+    record_message(msg)
     db.session.commit()
+    publish_message(msg)
     return redirect(url_for('main.admin_chat_grouped'))
 
+def export_messages(serialize):
+    """Stream the Message table as JSON, or NDJSON when asked for it.
+
+    Supports ``?after=<id>&limit=<n>`` paging; the next page starts after the
+    last id in the response.
+    """
+    after = request.args.get('after', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    ndjson = request.args.get('format') == 'ndjson' or \
+        request.accept_mimetypes.best == 'application/x-ndjson'
+    rows = export_rows(after=after, limit=limit)
+    return Response(
+        stream_with_context(stream_json(rows, serialize, ndjson=ndjson)),
+        mimetype='application/x-ndjson' if ndjson else 'application/json'
+    )
+
 @main.route('/chat/messages')
+@login_required
 def get_messages_json():
-    messages = Message.query.order_by(Message.timestamp.asc()).all()
-    result = [{
+    # Every conversation, for the admin chat page.
+    if not current_user.is_admin():
+        abort(403)
+    return export_messages(lambda msg: {
+        "id": msg.id,
         "sender_id": msg.sender_id,
         "receiver_id": msg.receiver_id,
         "content": msg.content,
+        "is_admin": msg.is_admin,
         "timestamp": msg.timestamp.strftime("%Y-%m-%d %H:%M") if msg.timestamp else None
-    } for msg in messages]
-    return jsonify(result)
+    })
 
 @main.route('/admin_chat')
 def admin_chat():
@@ -422,21 +662,87 @@ def admin_chat():
     return render_template("admin_chat.html")
 
 @main.route('/admin/uploads', methods=['GET', 'POST'])
+@login_required
 def upload_file():
+    if not current_user.is_admin():
+        abort(403)
     if request.method == 'POST':
         uploaded = request.files['file']
         if uploaded and allowed_file(uploaded.filename):
             filename = secure_filename(uploaded.filename)
-            uploaded.save(os.path.join(UPLOAD_FOLDER, filename))
-
-            file_entry = OrderFile(filename=filename, uploader='admin')
-            db.session.add(file_entry)
-            db.session.commit()
+            stored = store_stream(uploaded.stream, filename, upload_folder(),
+                                  current_app.config['UPLOAD_MAX_FILE_SIZE'])
+            save_order_file(filename, stored, upload_order_id(request.form.get('order_id')))
             return redirect(url_for('main.upload_file'))
 
     files = OrderFile.query.order_by(OrderFile.uploaded_at.desc()).all()
     return render_template('admin_uploads.html', files=files)
 
+def upload_order_id(value):
+    """The order an upload is attached to, or None when none was given."""
+    if value in (None, ''):
+        return None
+    try:
+        order_id = int(value)
+    except (TypeError, ValueError):
+        abort(400, description='order_id must be an order number.')
+    if db.session.get(Order, order_id) is None:
+        abort(400, description=f'There is no order #{order_id}.')
+    return order_id
+
+def save_order_file(filename, stored, order_id=None):
+    file_entry = OrderFile(filename=filename, uploader='admin', order_id=order_id, stored_name=stored.stored_name,
+                           content_hash=stored.content_hash, size=stored.size)
+    db.session.add(file_entry)
+    db.session.commit()
+    return file_entry
+
+@main.route('/admin/uploads/resumable', methods=['POST'])
+@login_required
+def start_resumable_upload():
+    if not current_user.is_admin():
+        abort(403)
+    data = request.get_json(silent=True) or {}
+    filename = secure_filename(data.get('filename', ''))
+    size = data.get('size')
+    if not allowed_file(filename) or not isinstance(size, int) or size <= 0:
+        return jsonify({'error': 'A permitted filename and a positive size are required'}), 400
+    order_id = upload_order_id(data.get('order_id'))
+    upload_id = start_resumable(upload_folder(), filename, size, current_app.config['UPLOAD_MAX_FILE_SIZE'],
+                                order_id=order_id, expire_after=current_app.config['UPLOAD_RESUMABLE_TTL'])
+    return jsonify({'upload_id': upload_id, 'received': 0, 'chunk_size': UPLOAD_CHUNK_SIZE}), 201
+
+@main.route('/admin/uploads/resumable/<upload_id>', methods=['GET', 'PUT'])
+@login_required
+def resumable_upload(upload_id):
+    if not current_user.is_admin():
+        abort(403)
+    if request.method == 'GET':
+        meta, received = resumable_status(upload_folder(), upload_id)
+        return jsonify({'upload_id': upload_id, 'received': received, 'size': meta['size']})
+
+    received = append_chunk(upload_folder(), upload_id, request.headers.get('Content-Range'), request.stream)
+    meta, _ = resumable_status(upload_folder(), upload_id)
+    if received < meta['size']:
+        return jsonify({'upload_id': upload_id, 'received': received, 'size': meta['size']})
+
+    meta = finish_resumable(upload_folder(), upload_id,
+                            lambda filename, stored: save_order_file(filename, stored, meta.get('order_id')).id)
+    return jsonify({'upload_id': upload_id, 'received': received, 'size': meta['size'],
+                    'complete': True, 'file_id': meta['file_id']}), 201
+
+@main.route('/files/<int:file_id>')
+@login_required
+def download_order_file(file_id):
+    order_file = OrderFile.query.get_or_404(file_id)
+    order = order_file.order
+    if not (current_user.is_admin() or (order and order.user_id == current_user.id)):
+        abort(403)
+    if order_file.stored_name:
+        return send_stored_file(upload_folder(), order_file.stored_name, order_file.filename,
+                                order_file.content_hash)
+    return send_stored_file(LEGACY_UPLOAD_FOLDER, order_file.filename, order_file.filename)
+
 @main.route('/admin/payments')
 def admin_payments():
     if not current_user.is_admin:
@@ -445,8 +751,14 @@ def admin_payments():
 
 @main.route("/Samples")
 def Samples():
-    samples = Sample.query.order_by(Sample.created_at.desc()).all()
-    return render_template("Samples.html", samples=samples)
+    category = request.args.get("category")
+    query = Sample.query
+    if category:
+        query = query.filter_by(category=category)
+    samples = keyset_paginate(query, Sample.created_at, Sample.id,
+                              cursor=request.args.get("cursor"), per_page=SAMPLES_PER_PAGE)
+    categories = [c for (c,) in db.session.query(Sample.category).distinct().order_by(Sample.category)]
+    return render_template("Samples.html", samples=samples, categories=categories, selected_category=category)
 
 @main.route('/admin/announcements', methods=['GET', 'POST'])
 def admin_announcements():
@@ -454,26 +766,27 @@ def admin_announcements():
         title = request.form['title']
         body = request.form['body']
         audience = request.form.get('audience', 'public')
+        if audience not in ANNOUNCEMENT_AUDIENCES:
+            abort(400)
         category = request.form.get('category', 'general')
         new_announcement = Announcement(title=title, body=body, audience=audience, category=category)
         db.session.add(new_announcement)
         db.session.commit()
+        invalidate(prefix="index:announcements:")
         flash("Announcement posted!", "success")
         return redirect(url_for('main.admin_announcements'))
 
-    page = request.args.get('page', 1, type=int)
     category = request.args.get('category')
 
-    query = Announcement.query.order_by(Announcement.created_at.desc())
+    query = Announcement.query
     if category:
         query = query.filter_by(category=category)
 
-    pagination = query.paginate(page=page, per_page=5)
-    announcements = pagination.items
+    announcements = keyset_paginate(query, Announcement.created_at, Announcement.id,
+                                    cursor=request.args.get('cursor'), per_page=ANNOUNCEMENTS_PER_PAGE)
 
     return render_template("admin_announcements.html",
                            announcements=announcements,
-                           pagination=pagination,
                            selected_category=category)
 
 @main.route('/admin/settings', methods=['GET', 'POST'])
@@ -504,6 +817,7 @@ def admin_Blog():
         new_post = BlogPost(title=title, content=content)
         db.session.add(new_post)
         db.session.commit()
+        invalidate("index:posts")
         return redirect(url_for('main.admin_Blog'))
 
     posts = BlogPost.query.order_by(BlogPost.created_at.desc()).all()
@@ -516,6 +830,7 @@ def edit_blog(id):
         post.title = request.form['title']
         post.content = request.form['content']
         db.session.commit()
+        invalidate("index:posts")
         flash('Blog post updated!', 'success')
         return redirect(url_for('main.admin_Blog'))
     return render_template('edit_blog.html', post=post)
@@ -525,24 +840,44 @@ def delete_blog(id):
     post = BlogPost.query.get_or_404(id)
     db.session.delete(post)
     db.session.commit()
+    invalidate("index:posts")
     flash('Blog post deleted.', 'info')
     return redirect(url_for('main.admin_Blog'))
 
+@main.route('/admin/blog/bulk-delete', methods=['POST'])
+@login_required
+def bulk_delete_blog():
+    if not current_user.is_admin():
+        abort(403)
+    count = bulk_delete(BlogPost, parse_ids(request))
+    invalidate("index:posts")
+    return bulk_done(f'{count} blog posts deleted.', 'main.admin_Blog', count)
+
+@main.route('/admin/blog/import', methods=['POST'])
+@login_required
+def import_blog():
+    if not current_user.is_admin():
+        abort(403)
+    rows = read_rows(request.files['file'])
+    count = bulk_import(BlogPost, rows, required=('title', 'content'), optional=('created_at',),
+                        converters={'created_at': datetime.fromisoformat})
+    invalidate("index:posts")
+    return bulk_done(f'{count} blog posts imported.', 'main.admin_Blog', count)
+
 @main.route('/admin/messages', methods=['GET'])
+@main.route('/admin/messages/export', methods=['GET'])
 @login_required
 def admin_view_all():
-    if not current_user.is_admin:
-        return "Forbidden", 403
-    all_msgs = Message.query.order_by(Message.timestamp).all()
-    return jsonify([
-        {
-            'from': m.sender_id,
-            'to': m.receiver_id,
-            'content': m.content,
-            'is_admin': m.is_admin,
-            'timestamp': m.timestamp.strftime("%Y-%m-%d %H:%M") if m.timestamp else None
-        } for m in all_msgs
-    ])
+    if not current_user.is_admin():
+        abort(403)
+    return export_messages(lambda m: {
+        'id': m.id,
+        'from': m.sender_id,
+        'to': m.receiver_id,
+        'content': m.content,
+        'is_admin': m.is_admin,
+        'timestamp': m.timestamp.strftime("%Y-%m-%d %H:%M") if m.timestamp else None
+    })
 
 # ------------------------
 # 🏢 Company Section Routes
@@ -697,8 +1032,13 @@ def writer_apply():
         return redirect(url_for('main.index'))
     return render_template('writer_apply.html', form=form)
 
+MY_ORDERS_PER_PAGE = 20
+
 @main.route("/my-orders")
 @login_required
 def my_orders():
-    orders = current_user.orders
-    return render_template("my_orders.html", orders=orders)
\ No newline at end of file
+    orders = Order.query.filter_by(user_id=current_user.id)\
+        .options(joinedload(Order.writer), selectinload(Order.files))
+    page = keyset_paginate(orders, Order.created_at, Order.id,
+                           cursor=request.args.get("cursor"), per_page=MY_ORDERS_PER_PAGE)
+    return render_template("my_orders.html", orders=page)
\ No newline at end of file
@@ -0,0 +1,68 @@
+import click
+import sqlalchemy as sa
+from flask.cli import AppGroup
+from flask_migrate import stamp
+
+from app.extensions import db
+
+schema_cli = AppGroup("schema", help="Set up the database for a new install.")
+
+# The FTS5 indexes built by migrations e3f6b1c8a047 and f8a4d2b6c913, which
+# db.create_all() doesn't know about. SQLite only.
+FTS_STATEMENTS = [
+    """CREATE VIRTUAL TABLE blog_post_fts USING fts5(
+        title, content, content='blog_post', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER blog_post_fts_ai AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER blog_post_fts_ad AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_fts (blog_post_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER blog_post_fts_au AFTER UPDATE ON blog_post BEGIN
+        INSERT INTO blog_post_fts (blog_post_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO blog_post_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE VIRTUAL TABLE order_fts USING fts5(
+        topic, description, content='order', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER order_fts_ai AFTER INSERT ON "order" BEGIN
+        INSERT INTO order_fts (rowid, topic, description) VALUES (new.id, new.topic, new.description);
+    END""",
+    """CREATE TRIGGER order_fts_ad AFTER DELETE ON "order" BEGIN
+        INSERT INTO order_fts (order_fts, rowid, topic, description)
+        VALUES ('delete', old.id, old.topic, old.description);
+    END""",
+    """CREATE TRIGGER order_fts_au AFTER UPDATE OF topic, description ON "order" BEGIN
+        INSERT INTO order_fts (order_fts, rowid, topic, description)
+        VALUES ('delete', old.id, old.topic, old.description);
+        INSERT INTO order_fts (rowid, topic, description) VALUES (new.id, new.topic, new.description);
+    END""",
+]
+
+
+def create_schema(directory=None):
+    """Create every table in an empty database and stamp it at the migration head.
+
+    The early migrations were written against one development database and
+    don't replay on an empty one, on SQLite or PostgreSQL, so new installs
+    start from the models instead. Later migrations then apply with
+    ``flask db upgrade`` as usual.
+    """
+    if sa.inspect(db.engine).get_table_names():
+        raise click.ClickException("The database already has tables; use 'flask db upgrade'.")
+    db.create_all()
+    if db.engine.dialect.name == "sqlite":
+        with db.engine.begin() as conn:
+            for statement in FTS_STATEMENTS:
+                conn.execute(sa.text(statement))
+    stamp(directory=directory)
+
+
+@schema_cli.command("create")
+def create_command():
+    """Create the schema for a new install; see ``create_schema``."""
+    create_schema()
+    click.echo("Created the schema and stamped it at the migration head.")
@@ -0,0 +1,113 @@
+import re
+
+import sqlalchemy as sa
+from flask import current_app
+from markupsafe import Markup, escape
+
+from app.extensions import db
+from app.models import BlogPost, Order
+
+# Markers FTS5 wraps around matches; swapped for <mark> after escaping.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+# The FTS5 tables are created by migrations, not db.create_all(), so they
+# live in their own MetaData.
+fts_metadata = sa.MetaData()
+blog_post_fts = sa.Table(
+    "blog_post_fts", fts_metadata,
+    sa.Column("rowid", sa.Integer, primary_key=True),
+    sa.Column("title", sa.Text),
+    sa.Column("content", sa.Text),
+)
+order_fts = sa.Table(
+    "order_fts", fts_metadata,
+    sa.Column("rowid", sa.Integer, primary_key=True),
+    sa.Column("topic", sa.Text),
+    sa.Column("description", sa.Text),
+)
+
+
+def fts_available(table):
+    """Whether ``table`` exists as an FTS5 table on the current engine.
+
+    Checked once per app and remembered, since it only changes with a migration.
+    """
+    known = current_app.extensions.setdefault("fts_tables", {})
+    if table not in known:
+        if db.engine.dialect.name != "sqlite":
+            known[table] = False
+        else:
+            known[table] = db.session.execute(
+                sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": table}
+            ).first() is not None
+    return known[table]
+
+
+def fts_query(text):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word must appear; the last one may be a prefix, so results show up
+    while the user is still typing.
+    """
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return None
+    quoted = ['"%s"' % term for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def highlight(snippet):
+    return Markup(str(escape(snippet)).replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>"))
+
+
+def search_blog_posts(text, page=1, per_page=5):
+    """Paginate blog posts matching ``text``, best matches first.
+
+    Each returned post carries a ``snippet`` with the matched words
+    highlighted. Falls back to a LIKE search when FTS5 isn't set up.
+    """
+    match = fts_query(text)
+    if match is None:
+        return BlogPost.query.filter(sa.false()).paginate(page=page, per_page=per_page, error_out=False)
+
+    if not fts_available("blog_post_fts"):
+        pattern = f"%{text}%"
+        return BlogPost.query.filter(BlogPost.title.ilike(pattern) | BlogPost.content.ilike(pattern))\
+            .order_by(BlogPost.created_at.desc())\
+            .paginate(page=page, per_page=per_page, error_out=False)
+
+    snippet = sa.literal_column(
+        f"snippet(blog_post_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 24)"
+    )
+    pagination = BlogPost.query\
+        .join(blog_post_fts, blog_post_fts.c.rowid == BlogPost.id)\
+        .add_columns(snippet)\
+        .filter(sa.literal_column("blog_post_fts").op("MATCH")(match))\
+        .order_by(sa.literal_column("bm25(blog_post_fts, 10.0, 1.0)"))\
+        .paginate(page=page, per_page=per_page, error_out=False)
+
+    posts = []
+    for post, text_snippet in pagination.items:
+        post.snippet = highlight(text_snippet)
+        posts.append(post)
+    pagination.items = posts
+    return pagination
+
+
+def order_search_filter(text):
+    """A filter clause limiting ``Order`` rows to those matching ``text``.
+
+    Uses the FTS5 index over topic and description when present, otherwise
+    LIKE. Returns ``None`` when ``text`` has nothing searchable in it.
+    """
+    match = fts_query(text)
+    if match is None:
+        return None
+    if not fts_available("order_fts"):
+        pattern = f"%{text}%"
+        return Order.topic.ilike(pattern) | Order.description.ilike(pattern)
+    matching = sa.select(order_fts.c.rowid).where(sa.literal_column("order_fts").op("MATCH")(match))
+    return Order.id.in_(matching)
@@ -0,0 +1,19 @@
+from sqlalchemy import event
+
+
+def configure_sqlite(engine, pragmas):
+    """Apply ``pragmas`` to every new connection of a SQLite ``engine``.
+
+    WAL lets readers run alongside the single writer instead of blocking on
+    its commits, and ``busy_timeout`` makes writers queue for the lock rather
+    than fail straight away with "database is locked".
+    """
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
@@ -0,0 +1,140 @@
+import json
+import time
+import traceback
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+
+from app.extensions import db
+from app.models import Task
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+# A running task whose worker died is picked up again after this long.
+LEASE_SECONDS = 300
+BATCH_SIZE = 20
+
+# Task name -> handler, filled by the @task decorator.
+HANDLERS = {}
+
+tasks_cli = AppGroup("tasks", help="Run queued background tasks.")
+
+
+def task(name):
+    """Register the decorated function as the handler for task ``name``.
+
+    Handlers get the enqueued keyword arguments and run inside a transaction
+    that is committed only if they return normally, so a retried handler
+    never sees half of its own earlier work.
+    """
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, delay=None, **kwargs):
+    """Queue task ``name`` as part of the caller's transaction.
+
+    The task only becomes visible once the caller commits, so work is never
+    queued for a row that was rolled back, and never lost for one that was
+    saved.
+    """
+    entry = Task(name=name, payload=json.dumps(kwargs))
+    if delay:
+        entry.run_at = datetime.utcnow() + delay
+    db.session.add(entry)
+    return entry
+
+
+def backoff(attempts):
+    return timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def claim(task_id, now):
+    """Take a due task for this worker; False if another worker got there first."""
+    claimed = Task.query.filter(
+        Task.id == task_id,
+        Task.status.in_(("pending", "running")),
+        Task.run_at <= now,
+    ).update({
+        Task.status: "running",
+        Task.attempts: Task.attempts + 1,
+        Task.run_at: now + timedelta(seconds=LEASE_SECONDS),
+    }, synchronize_session=False)
+    db.session.commit()
+    return claimed == 1
+
+
+def run_one(entry):
+    handler = HANDLERS.get(entry.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for task {entry.name!r}")
+        handler(**json.loads(entry.payload))
+    except Exception as e:
+        db.session.rollback()
+        entry = db.session.get(Task, entry.id)
+        entry.last_error = "".join(traceback.format_exception_only(type(e), e)).strip()
+        if entry.attempts >= MAX_ATTEMPTS:
+            entry.status = "failed"
+        else:
+            entry.status = "pending"
+            entry.run_at = datetime.utcnow() + backoff(entry.attempts)
+        db.session.commit()
+        return False
+    entry.status = "done"
+    entry.finished_at = datetime.utcnow()
+    db.session.commit()
+    return True
+
+
+def run_pending(batch_size=BATCH_SIZE):
+    """Run one batch of due tasks. Returns ``(done, failed)``.
+
+    Tasks are claimed one at a time, so several workers can share a queue.
+    """
+    now = datetime.utcnow()
+    due = db.session.query(Task.id).filter(
+        Task.status.in_(("pending", "running")),
+        Task.run_at <= now,
+    ).order_by(Task.run_at, Task.id).limit(batch_size).all()
+
+    done = failed = 0
+    for (task_id,) in due:
+        if not claim(task_id, now):
+            continue
+        if run_one(db.session.get(Task, task_id)):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
+
+
+@tasks_cli.command("flush")
+@click.option("--batch-size", type=int, default=BATCH_SIZE)
+def flush_command(batch_size):
+    """Run everything that is currently due, then exit."""
+    total_done = total_failed = 0
+    while True:
+        done, failed = run_pending(batch_size)
+        total_done += done
+        total_failed += failed
+        if done + failed == 0:
+            break
+    click.echo(f"Done {total_done}, failed {total_failed}.")
+
+
+@tasks_cli.command("work")
+@click.option("--interval", type=float, default=1.0, help="Seconds to sleep when nothing is due.")
+@click.option("--batch-size", type=int, default=BATCH_SIZE)
+def work_command(interval, batch_size):
+    """Keep running due tasks until interrupted."""
+    while True:
+        done, failed = run_pending(batch_size)
+        if done or failed:
+            click.echo(f"Done {done}, failed {failed}.")
+        else:
+            db.session.remove()
+            time.sleep(interval)
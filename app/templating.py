@@ -0,0 +1,58 @@
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from jinja2 import FileSystemBytecodeCache, TemplateError, TemplateSyntaxError
+
+templates_cli = AppGroup("templates", help="Manage the compiled template cache.")
+
+
+def cache_dir(app):
+    return app.config.get("JINJA_CACHE_DIR") or os.path.join(app.instance_path, "jinja_cache")
+
+
+def init_template_cache(app):
+    """Keep compiled templates on disk so new workers skip compiling them.
+
+    Jinja keys each entry by template name and checks it against a hash of
+    the source, so an edited template is recompiled and a cache written by
+    another Python version is ignored.
+    """
+    app.cli.add_command(templates_cli)
+    if not app.config.get("JINJA_BYTECODE_CACHE", True):
+        return
+    directory = cache_dir(app)
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+@templates_cli.command("precompile")
+@click.option("--clear", is_flag=True, help="Drop cached entries first, so every template is compiled again.")
+def precompile_command(clear):
+    """Compile every template into the bytecode cache; run at deploy time."""
+    env = current_app.jinja_env
+    if env.bytecode_cache is None:
+        raise click.ClickException("JINJA_BYTECODE_CACHE is disabled.")
+    if clear:
+        env.bytecode_cache.clear()
+
+    start = time.perf_counter()
+    names = env.list_templates(extensions=["html"])
+    failed = 0
+    for name in names:
+        try:
+            # Through the loader rather than get_template, which would return
+            # templates this process already holds without touching the cache.
+            env.loader.load(env, name, env.make_globals(None))
+        except TemplateSyntaxError as e:
+            failed += 1
+            click.echo(f"{name}:{e.lineno}: {e.message}", err=True)
+        except (TemplateError, UnicodeDecodeError, OSError) as e:
+            failed += 1
+            click.echo(f"{name}: {e}", err=True)
+    click.echo(f"Compiled {len(names) - failed} of {len(names)} templates into "
+               f"{cache_dir(current_app)} in {time.perf_counter() - start:.2f}s")
+    if failed:
+        raise SystemExit(1)
@@ -0,0 +1,283 @@
+import hashlib
+import json
+import os
+import re
+import secrets
+import tempfile
+import time
+from contextlib import contextmanager
+
+from flask import current_app, request
+from werkzeug.exceptions import BadRequest, Conflict, NotFound, RequestEntityTooLarge
+from werkzeug.utils import send_file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CHUNK_SIZE = 1024 * 1024  # bytes read or written per step
+PARTIAL_DIR = ".partial"
+
+CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)$")
+
+
+class StoredFile:
+    def __init__(self, content_hash, size, stored_name):
+        self.content_hash = content_hash
+        self.size = size
+        self.stored_name = stored_name
+
+
+def extension(filename):
+    return os.path.splitext(filename)[1].lower()
+
+
+def commit_to_store(temp_path, content_hash, size, filename, folder):
+    """Move a fully written temp file to its content-addressed name.
+
+    Files are named after their SHA-256, so uploading the same bytes twice
+    keeps a single copy on disk.
+    """
+    stored_name = content_hash + extension(filename)
+    target = os.path.join(folder, stored_name)
+    if os.path.exists(target):
+        os.remove(temp_path)
+    else:
+        os.replace(temp_path, target)
+    return StoredFile(content_hash, size, stored_name)
+
+
+def store_stream(stream, filename, folder, max_size):
+    """Copy ``stream`` into the upload store ``CHUNK_SIZE`` bytes at a time.
+
+    The SHA-256 is computed while copying, so the file is read once and never
+    held in memory. Raises ``RequestEntityTooLarge`` past ``max_size`` bytes.
+    """
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size and size > max_size:
+                    raise RequestEntityTooLarge()
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return commit_to_store(temp_path, digest.hexdigest(), size, filename, folder)
+
+
+# Resumable uploads: the client announces the file, then PUTs it in pieces
+# with Content-Range headers. State lives next to the partial file on disk so
+# any worker can take the next piece.
+
+def partial_paths(folder, upload_id):
+    if not re.fullmatch(r"[0-9a-f]{32}", upload_id):
+        raise NotFound()
+    base = os.path.join(folder, PARTIAL_DIR, upload_id)
+    return base + ".part", base + ".json"
+
+
+@contextmanager
+def upload_lock(folder, upload_id):
+    """Hold an exclusive lock on one upload, across threads and workers.
+
+    The lock is taken on the metadata file, so once it is held the upload's
+    state can be read and changed without another request interleaving, e.g.
+    a client retrying a slow piece.
+    """
+    _, meta_path = partial_paths(folder, upload_id)
+    try:
+        f = open(meta_path, "rb")
+    except FileNotFoundError:
+        raise NotFound()
+    with f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def write_meta(meta_path, meta):
+    # In place rather than by rename: the file is the one holding the lock.
+    with open(meta_path, "r+") as f:
+        f.truncate()
+        json.dump(meta, f)
+
+
+def start_resumable(folder, filename, size, max_size, order_id=None, expire_after=None):
+    if max_size and size > max_size:
+        raise RequestEntityTooLarge()
+    os.makedirs(os.path.join(folder, PARTIAL_DIR), exist_ok=True)
+    if expire_after:
+        sweep_resumable(folder, expire_after)
+    upload_id = secrets.token_hex(16)
+    part_path, meta_path = partial_paths(folder, upload_id)
+    open(part_path, "wb").close()
+    with open(meta_path, "w") as f:
+        json.dump({"filename": filename, "size": size, "order_id": order_id}, f)
+    return upload_id
+
+
+def read_state(folder, upload_id):
+    part_path, meta_path = partial_paths(folder, upload_id)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if "file_id" in meta:
+            return meta, meta["size"]
+        return meta, os.path.getsize(part_path)
+    except FileNotFoundError:
+        raise NotFound()
+
+
+def resumable_status(folder, upload_id):
+    """``(meta, bytes received so far)`` for an upload in progress or finished."""
+    with upload_lock(folder, upload_id):
+        return read_state(folder, upload_id)
+
+
+def append_chunk(folder, upload_id, content_range, stream):
+    """Append one ``Content-Range`` piece of the body stream to the upload.
+
+    Pieces must arrive in order; a piece that doesn't start where the last
+    one ended raises ``Conflict`` so the client can ask for the offset and
+    resume from there. Returns the number of bytes received so far.
+    """
+    match = CONTENT_RANGE.match(content_range or "")
+    if not match:
+        raise BadRequest("Content-Range header required, e.g. 'bytes 0-1048575/5242880'.")
+    start, end, total = (int(g) for g in match.groups())
+
+    with upload_lock(folder, upload_id):
+        meta, received = read_state(folder, upload_id)
+        if total != meta["size"] or end < start or end >= total:
+            raise BadRequest("Content-Range does not match this upload.")
+        if start != received:
+            raise Conflict(f"Expected a piece starting at byte {received}.")
+
+        part_path, _ = partial_paths(folder, upload_id)
+        expected = end - start + 1
+        written = 0
+        with open(part_path, "ab") as out:
+            while written < expected:
+                chunk = stream.read(min(CHUNK_SIZE, expected - written))
+                if not chunk:
+                    break
+                out.write(chunk)
+                written += len(chunk)
+        if written != expected:
+            # Drop a short piece so the next attempt starts from a clean offset.
+            with open(part_path, "r+b") as out:
+                out.truncate(received)
+            raise BadRequest("Body is shorter than its Content-Range.")
+    return received + written
+
+
+def finish_resumable(folder, upload_id, save):
+    """Move a completed upload into the content-addressed store, once.
+
+    ``save(filename, stored)`` records the file and returns its id, which is
+    kept in the upload's metadata; finishing an upload again returns the
+    same metadata without storing or saving it twice.
+    """
+    with upload_lock(folder, upload_id):
+        meta, received = read_state(folder, upload_id)
+        if "file_id" in meta:
+            return meta
+        if received != meta["size"]:
+            raise Conflict(f"Only {received} of {meta['size']} bytes received.")
+        part_path, meta_path = partial_paths(folder, upload_id)
+        digest = hashlib.sha256()
+        with open(part_path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        stored = commit_to_store(part_path, digest.hexdigest(), received, meta["filename"], folder)
+        meta["file_id"] = save(meta["filename"], stored)
+        write_meta(meta_path, meta)
+    return meta
+
+
+def sweep_resumable(folder, max_age):
+    """Delete upload state untouched for ``max_age`` seconds.
+
+    This covers uploads that were abandoned part way, and finished uploads
+    whose metadata is only kept so a retried last piece gets the same answer.
+    """
+    directory = os.path.join(folder, PARTIAL_DIR)
+    cutoff = time.time() - max_age
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    removed = 0
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        base = os.path.join(directory, name[:-len(".json")])
+        paths = [base + ".json", base + ".part"]
+        try:
+            if max(os.path.getmtime(p) for p in paths if os.path.exists(p)) >= cutoff:
+                continue
+        except (OSError, ValueError):
+            continue
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        removed += 1
+    return removed
+
+
+def send_stored_file(folder, stored_name, download_name, content_hash=None):
+    """Send a stored upload as an attachment.
+
+    Range and conditional requests are answered here, with the content hash
+    as a strong ETag when known. With ``UPLOAD_SENDFILE`` set to
+    ``"x-sendfile"`` (Apache, lighttpd) or ``"x-accel"`` (nginx) only the
+    headers are built here and the proxy streams the bytes, ranges included.
+    """
+    path = os.path.join(folder, stored_name)
+    if not os.path.isfile(path):
+        raise NotFound()
+    mode = current_app.config.get("UPLOAD_SENDFILE")
+    offload = mode in ("x-sendfile", "x-accel")
+
+    response = send_file(
+        path, request.environ,
+        as_attachment=True,
+        download_name=download_name,
+        etag=content_hash or True,
+        conditional=not offload,
+        use_x_sendfile=offload,
+        response_class=current_app.response_class,
+    )
+    if not offload:
+        return response
+
+    # The proxy handles Range itself; only answer If-None-Match here.
+    response = response.make_conditional(request, accept_ranges=False)
+    if response.status_code == 304:
+        del response.headers["X-Sendfile"]
+    elif mode == "x-accel":
+        del response.headers["X-Sendfile"]
+        response.headers["X-Accel-Redirect"] = current_app.config["UPLOAD_ACCEL_PREFIX"] + stored_name
+    return response
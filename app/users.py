@@ -0,0 +1,22 @@
+import click
+from flask.cli import AppGroup
+
+from app.extensions import db
+from app.models import User
+
+ROLES = ("user", "writer", "admin")
+
+users_cli = AppGroup("users", help="Manage user accounts.")
+
+
+@users_cli.command("set-role")
+@click.argument("email")
+@click.argument("role", type=click.Choice(ROLES))
+def set_role_command(email, role):
+    """Give the account registered as EMAIL the given ROLE."""
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        raise click.ClickException(f"No user with email {email}.")
+    user.role = role
+    db.session.commit()
+    click.echo(f"{email} is now {role}.")
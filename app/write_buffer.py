@@ -0,0 +1,182 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+
+from app.extensions import db
+from app.metrics import write_buffer_batch_rows, write_buffer_flush_duration
+
+logger = logging.getLogger(__name__)
+
+
+class PendingRow:
+    def __init__(self, model, values, before_commit=None, after_commit=None, stamp=None):
+        self.model = model
+        self.values = values
+        self.before_commit = before_commit
+        self.after_commit = after_commit
+        self.stamp = stamp
+
+    def build(self):
+        values = dict(self.values)
+        if self.stamp:
+            values[self.stamp] = datetime.utcnow()
+        return self.model(**values)
+
+
+class WriteBuffer:
+    """Write-behind buffer that commits small inserts in batches.
+
+    Rows queued with ``add`` are written by a background thread in one
+    transaction once ``max_rows`` are waiting or the oldest has waited
+    ``max_delay`` seconds. On SQLite that turns one fsync per row into one
+    per batch. Rows still waiting when the process exits are written by an
+    ``atexit`` hook; a hard crash loses at most one batch window.
+    """
+
+    def __init__(self, app, max_rows=100, max_delay=0.05, max_pending=10000):
+        self.app = app
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._cond = threading.Condition()
+        self._pending = []
+        self._first_at = 0.0
+        self._thread = None
+        self._pid = None
+        self._stopping = False
+        atexit.register(self.stop)
+
+    def add(self, row):
+        """Queue ``row``; False when it must be written synchronously instead."""
+        with self._cond:
+            if self._stopping or len(self._pending) >= self.max_pending:
+                return False
+            self._ensure_thread()
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append(row)
+            if len(self._pending) == 1 or len(self._pending) >= self.max_rows:
+                self._cond.notify()
+        return True
+
+    def _ensure_thread(self):
+        # Threads don't survive a fork, so a preloaded app starts its own
+        # flusher in each worker.
+        if self._thread is None or self._pid != os.getpid():
+            if self._pid is not None and self._pid != os.getpid():
+                self._pending = []  # the parent's rows, which it writes itself
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="write-buffer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                deadline = self._first_at + self.max_delay
+                while len(self._pending) < self.max_rows and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, []
+                stopping = self._stopping
+            if batch:
+                self.write(batch)
+            if stopping:
+                return
+
+    def write(self, batch):
+        """Commit ``batch`` in one transaction, falling back to row by row.
+
+        A row that fails on its own is logged and dropped, so one bad row
+        can't hold up the rest.
+        """
+        start = time.perf_counter()
+        with self.app.app_context():
+            # after_commit hooks read the rows back; keep them loaded rather
+            # than refreshing each one. The session is discarded below.
+            db.session().expire_on_commit = False
+            try:
+                committed = self._insert(batch)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Buffered batch of %d rows failed; retrying one at a time", len(batch))
+                committed = []
+                for row in batch:
+                    try:
+                        committed += self._insert([row])
+                    except Exception:
+                        db.session.rollback()
+                        logger.exception("Dropped buffered %s row %r", row.model.__name__, row.values)
+            for obj, row in committed:
+                if row.after_commit:
+                    try:
+                        row.after_commit(obj)
+                    except Exception:
+                        logger.exception("after_commit hook failed for %s", row.model.__name__)
+            db.session.remove()
+        write_buffer_flush_duration.observe((), time.perf_counter() - start)
+        write_buffer_batch_rows.observe((), len(batch))
+
+    def _insert(self, batch):
+        committed = []
+        for row in batch:
+            obj = row.build()
+            db.session.add(obj)
+            if row.before_commit:
+                row.before_commit(obj)
+            committed.append((obj, row))
+        db.session.commit()
+        return committed
+
+    def stop(self):
+        """Write whatever is queued and stop the flusher thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread = self._thread if self._pid == os.getpid() else None
+        if thread is not None:
+            thread.join(timeout=10)
+
+
+def init_write_buffer(app):
+    if app.config.get("WRITE_BUFFER_ENABLED"):
+        app.extensions["write_buffer"] = WriteBuffer(
+            app,
+            max_rows=app.config["WRITE_BUFFER_MAX_ROWS"],
+            max_delay=app.config["WRITE_BUFFER_MAX_DELAY_MS"] / 1000,
+        )
+
+
+def buffered_insert(model, values, before_commit=None, after_commit=None, stamp=None):
+    """Insert a ``model`` row, through the write buffer when it is enabled.
+
+    ``before_commit`` runs with the new object inside the transaction, and
+    ``after_commit`` once it is committed. ``stamp`` names a column set to
+    the current time when the row is actually written, so a queued row
+    isn't dated before rows committed ahead of it. Returns the object when
+    it was written synchronously, or ``None`` when it was queued.
+
+    Only for rows nobody reads back straight away: a queued row is missing
+    from queries until its batch is flushed.
+    """
+    row = PendingRow(model, values, before_commit, after_commit, stamp)
+    buffer = current_app.extensions.get("write_buffer")
+    if buffer is not None and buffer.add(row):
+        return None
+
+    obj = row.build()
+    db.session.add(obj)
+    if before_commit:
+        before_commit(obj)
+    db.session.commit()
+    if after_commit:
+        after_commit(obj)
+    return obj
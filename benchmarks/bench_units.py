@@ -0,0 +1,70 @@
+"""pytest-benchmark suite for the functions behind the hot routes.
+
+Not collected by a plain ``pytest`` run; run it explicitly:
+
+    pytest benchmarks/bench_units.py --benchmark-only
+    pytest benchmarks/bench_units.py --benchmark-autosave --benchmark-compare
+
+The database is seeded once per session at BENCH_SCALE (default 0.1 of the
+full volumes in ``benchmarks.seed``), or reused from BENCH_DB if it exists.
+"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.seed import build
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    db_path = os.environ.get("BENCH_DB") or str(tmp_path_factory.mktemp("bench") / "bench.db")
+    return build(db_path, float(os.environ.get("BENCH_SCALE", 0.1)))
+
+
+@pytest.fixture
+def app_context(app):
+    with app.app_context():
+        yield
+
+
+@pytest.fixture
+def chatty_user_id(app_context):
+    from app.models import Conversation
+    return Conversation.query.order_by(Conversation.message_count.desc()).first().user_id
+
+
+def test_calculate_price(benchmark):
+    from app.models import calculate_price
+    deadline = datetime.utcnow() + timedelta(days=3)
+    assert benchmark(calculate_price, 1100, "Masters", deadline) > 0
+
+
+def test_get_grouped_chats_first_page(benchmark, app_context):
+    from app.routes import get_grouped_chats
+    assert benchmark(lambda: get_grouped_chats(page=1).items)
+
+
+def test_get_grouped_chats_deep_page(benchmark, app_context):
+    from app.routes import get_grouped_chats
+    benchmark(lambda: get_grouped_chats(page=50).items)
+
+
+def test_messages_since(benchmark, chatty_user_id):
+    from app.chat import messages_since
+    assert benchmark(messages_since, chatty_user_id, (datetime(1970, 1, 1), 0))
+
+
+def test_search_blog_posts(benchmark, app_context):
+    from app.search import search_blog_posts
+    assert benchmark(lambda: search_blog_posts("research method").items)
+
+
+def test_admin_orders_first_page(benchmark, app_context):
+    from app.models import Order
+    from app.pagination import keyset_paginate
+    benchmark(lambda: keyset_paginate(
+        Order.query.filter(Order.status == "Pending"), Order.created_at, Order.id, None, 25
+    ).items)
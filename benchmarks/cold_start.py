@@ -0,0 +1,99 @@
+"""First-request latency of a fresh worker, with and without compiled templates.
+
+Each run starts a new Python process, builds the app and times the first
+request to each route, which is when its templates get compiled. Runs
+go without the bytecode cache, with an empty cache, and with a cache
+warmed by ``flask templates precompile``. Medians are over ``--runs``
+processes.
+
+    python -m benchmarks.cold_start --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import build
+
+ROUTES = ["/", "/Blog", "/Samples", "/order", "/Register now", "/admin/orders", "/my-orders"]
+
+
+def child(db_path):
+    start = time.perf_counter()
+    from benchmarks.sqlite_concurrency import make_app
+    app = make_app(db_path, True)
+    timings = {"create_app": time.perf_counter() - start}
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["_user_id"] = "1"
+    for path in ROUTES:
+        start = time.perf_counter()
+        response = client.get(path)
+        timings[path] = time.perf_counter() - start
+        if response.status_code != 200:
+            timings[path] = None
+    print(json.dumps(timings))
+
+
+def spawn(args, env):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", *args],
+        env={**os.environ, **env}, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="seeded database; built with benchmarks.seed if missing")
+    parser.add_argument("--scale", type=float, default=0.05, help="seed volume when building --db")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "bench.db")
+        app = build(db_path, args.scale)
+        cache_env = {"JINJA_CACHE_DIR": os.path.join(tmp, "jinja_cache")}
+
+        def clear():
+            with app.app_context():
+                app.config["JINJA_CACHE_DIR"] = cache_env["JINJA_CACHE_DIR"]
+                from app.templating import init_template_cache
+                init_template_cache(app)
+                app.jinja_env.bytecode_cache.clear()
+
+        def precompile():
+            clear()
+            result = app.test_cli_runner().invoke(args=["templates", "precompile"])
+            print(result.output.strip())
+
+        modes = [
+            ("no cache", {"JINJA_BYTECODE_CACHE": "false"}, lambda: None),
+            ("empty cache", cache_env, clear),
+            ("precompiled", cache_env, precompile),
+        ]
+        samples = {}
+        for label, env, prepare in modes:
+            runs = []
+            for _ in range(args.runs):
+                prepare()
+                runs.append(spawn(["--child", db_path], env))
+            samples[label] = runs
+
+        columns = ["create_app", *ROUTES]
+        print(f"{'ms (median)':14}" + "".join(f"{c:>14}" for c in columns) + f"{'first reqs':>12}")
+        for label, runs in samples.items():
+            medians = [statistics.median(r[c] for r in runs if r[c] is not None) for c in columns]
+            print(f"{label:14}" + "".join(f"{m * 1000:14.1f}" for m in medians)
+                  + f"{sum(medians[1:]) * 1000:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
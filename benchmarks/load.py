@@ -0,0 +1,99 @@
+"""Latency percentiles for the hot routes against a seeded database.
+
+Requests go through the WSGI app in-process (Flask's test client), so the
+numbers cover routing, views, SQL and templates but not a real server or
+network. Each route gets ``--warmup`` unmeasured requests first. The query
+count per request comes from the Server-Timing header.
+
+    python -m benchmarks.load --db /tmp/bench.db --requests 200 --concurrency 4
+"""
+import argparse
+import logging
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import sqlalchemy as sa
+
+from benchmarks.seed import build
+from benchmarks.sqlite_concurrency import percentile
+
+ROUTES = [
+    ("index", "/"),
+    ("blog_list", "/Blog"),
+    ("blog_list search", "/Blog?q=research+method"),
+    ("admin_dashboard", "/admin"),
+    ("get_messages", "/get_messages"),
+    ("get_messages since", "/get_messages?since={recent_message_id}"),
+    ("admin_orders", "/admin/orders"),
+    ("admin_orders filtered", "/admin/orders?q=analysis&status=Pending"),
+]
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def chattiest_user(app):
+    """The user with the most messages, and an id near the end of their thread."""
+    from app.extensions import db
+    with app.app_context():
+        user_id, last_id = db.session.execute(sa.text(
+            "SELECT user_id, last_message_id FROM conversation ORDER BY message_count DESC LIMIT 1"
+        )).one()
+    return user_id, max(0, last_id - 500)
+
+
+def measure(app, path, user_id, count, concurrency, clear_cache):
+    def one(_):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+        if clear_cache:
+            app.extensions["page_cache"].clear()
+        start = time.perf_counter()
+        response = client.get(path)
+        elapsed = time.perf_counter() - start
+        match = QUERIES.search(response.headers.get("Server-Timing", ""))
+        return elapsed, response.status_code, int(match.group(1)) if match else 0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(count)))
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="seeded database; built with benchmarks.seed if missing")
+    parser.add_argument("--scale", type=float, default=1.0, help="seed volume when building --db")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--no-page-cache", action="store_true", help="clear the page cache before each request")
+    parser.add_argument("--only", nargs="*", help="route labels to run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build(args.db or os.path.join(tmp, "bench.db"), args.scale)
+        # Slow request and query warnings would drown out the table.
+        logging.getLogger("app.metrics").setLevel(logging.ERROR)
+        user_id, recent_message_id = chattiest_user(app)
+
+        print(f"{'route':24} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'queries':>8}")
+        for label, path in ROUTES:
+            if args.only and label not in args.only:
+                continue
+            path = path.format(recent_message_id=recent_message_id)
+            measure(app, path, user_id, args.warmup, 1, args.no_page_cache)
+            wall, results = measure(app, path, user_id, args.requests, args.concurrency, args.no_page_cache)
+            latencies = [r[0] for r in results]
+            errors = sum(1 for r in results if r[1] >= 400)
+            print(f"{label:24} {len(results) / wall:8.1f} "
+                  + " ".join(f"{percentile(latencies, p) * 1000:8.2f}" for p in (50, 90, 99, 100))
+                  + f" {sum(r[2] for r in results) / len(results):8.1f}"
+                  + (f"  ({errors} errors, status {results[0][1]})" if errors else ""))
+
+
+if __name__ == "__main__":
+    main()
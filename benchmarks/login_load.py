@@ -0,0 +1,109 @@
+"""Login throughput against page latency under a mixed load.
+
+Login threads post valid credentials to /login in a loop while page
+threads fetch a read-heavy route, first with no logins as a baseline,
+then with hashes on the request threads (PASSWORD_HASH_WORKERS=0), then
+on the bounded hashing pool. Like ``benchmarks.load`` this runs in-process
+through the test client; rate limits are switched off.
+
+    python -m benchmarks.login_load --login-threads 8 --page-threads 4 --seconds 10
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.seed import build
+from benchmarks.sqlite_concurrency import percentile
+
+EMAIL = "bench-login@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+def add_login_user(app):
+    from app.extensions import db
+    from app.models import User
+    with app.app_context():
+        user = User.query.filter_by(email=EMAIL).first()
+        if user is None:
+            user = User(email=EMAIL, name="Bench Login")
+            db.session.add(user)
+        user.set_password(PASSWORD)
+        db.session.commit()
+
+
+def run(app, login_threads, page_threads, page_path, seconds):
+    results = {"login": [], "page": []}
+    errors = {"login": 0, "page": 0}
+    stop = time.perf_counter() + seconds
+    lock = threading.Lock()
+
+    def loop(kind):
+        client = app.test_client()
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            if kind == "login":
+                response = client.post("/login", data={"email": EMAIL, "password": PASSWORD})
+                client.get("/logout")
+                ok = response.status_code == 302
+            else:
+                response = client.get(page_path)
+                ok = response.status_code == 200
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    results[kind].append(elapsed)
+                else:
+                    errors[kind] += 1
+
+    threads = [threading.Thread(target=loop, args=("login",)) for _ in range(login_threads)]
+    threads += [threading.Thread(target=loop, args=("page",)) for _ in range(page_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="seeded database; built with benchmarks.seed if missing")
+    parser.add_argument("--scale", type=float, default=0.1, help="seed volume when building --db")
+    parser.add_argument("--login-threads", type=int, default=8)
+    parser.add_argument("--page-threads", type=int, default=4)
+    parser.add_argument("--page", default="/Blog", help="route the page threads fetch")
+    parser.add_argument("--hash-workers", type=int, default=2, help="pool size for the pooled run")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    from app.passwords import init_password_hasher
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build(args.db or os.path.join(tmp, "bench.db"), args.scale)
+        logging.getLogger("app.metrics").setLevel(logging.ERROR)
+        app.config.update(RATE_LIMIT_ENABLED=False, WTF_CSRF_ENABLED=False)
+        add_login_user(app)
+
+        runs = [
+            ("pages only", 0, 0),
+            ("inline hashing", args.login_threads, 0),
+            (f"pool of {args.hash_workers}", args.login_threads, args.hash_workers),
+        ]
+        print(f"{'run':18} {'logins/s':>9} {'login p50':>10} {'login p99':>10} "
+              f"{'pages/s':>8} {'page p50':>9} {'page p99':>9} {'errors':>7}")
+        for label, login_threads, workers in runs:
+            app.config["PASSWORD_HASH_WORKERS"] = workers
+            init_password_hasher(app)
+            results, errors = run(app, login_threads, args.page_threads, args.page, args.seconds)
+            logins, pages = results["login"], results["page"]
+            print(f"{label:18} {len(logins) / args.seconds:9.1f} "
+                  f"{percentile(logins, 50) * 1000:10.1f} {percentile(logins, 99) * 1000:10.1f} "
+                  f"{len(pages) / args.seconds:8.1f} "
+                  f"{percentile(pages, 50) * 1000:9.1f} {percentile(pages, 99) * 1000:9.1f} "
+                  f"{errors['login'] + errors['page']:7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Build a SQLite database with production-like volumes for benchmarking.
+
+The schema is set up like a new install (``flask schema create``), so the
+FTS tables and their triggers exist and get filled as rows go in. At ``--scale 1`` that is 100k chat
+messages, 50k orders and 5k blog posts.
+
+    python -m benchmarks.seed /tmp/bench.db --scale 1
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+from benchmarks.sqlite_concurrency import make_app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BATCH_SIZE = 5000
+
+VOLUMES = {
+    "users": 2000,
+    "writers": 200,
+    "messages": 100_000,
+    "orders": 50_000,
+    "posts": 5000,
+    "announcements": 200,
+    "testimonials": 100,
+}
+
+WORDS = (
+    "essay research analysis literature review thesis argument evidence method data case study "
+    "history economics psychology nursing marketing finance biology ethics policy climate health "
+    "education technology management sociology statistics philosophy law culture media design"
+).split()
+LEVELS = ["Undergrad", "Masters", "PhD"]
+STATUSES = ["Pending", "In Progress", "Completed", "Cancelled"]
+
+
+def sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+
+def timeline(rng, count, days=180):
+    """``count`` ascending timestamps spread over the last ``days`` days."""
+    start = datetime.utcnow() - timedelta(days=days)
+    span = days * 86400
+    return [start + timedelta(seconds=s) for s in sorted(rng.uniform(0, span) for _ in range(count))]
+
+
+def insert_batches(model, rows):
+    from app.extensions import db
+    for i in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(sa.insert(model), rows[i:i + BATCH_SIZE])
+    db.session.commit()
+
+
+def seed(scale=1.0, rng_seed=42):
+    """Fill the current app's (freshly created) database. Returns row counts."""
+    from app.counters import reconcile
+    from app.extensions import db
+    from app.models import Announcement, BlogPost, Message, Order, Testimonial, User, Writer
+
+    rng = random.Random(rng_seed)
+    n = {name: max(1, int(count * scale)) for name, count in VOLUMES.items()}
+
+    insert_batches(User, [
+        dict(email=f"user{i}@example.com", name=f"User {i}", password_hash="x", created_at=ts)
+        for i, ts in enumerate(timeline(rng, n["users"], days=365), start=1)
+    ])
+    insert_batches(Writer, [
+        dict(name=f"Writer {i}", subject=rng.choice(WORDS), approved=rng.random() < 0.8, created_at=ts)
+        for i, ts in enumerate(timeline(rng, n["writers"], days=365), start=1)
+    ])
+
+    # A few very chatty users and a long tail, like a real support inbox.
+    chatty = [rng.randint(1, n["users"]) for _ in range(20)]
+    messages = []
+    for ts in timeline(rng, n["messages"]):
+        user_id = rng.choice(chatty) if rng.random() < 0.2 else rng.randint(1, n["users"])
+        if rng.random() < 0.4:
+            messages.append(dict(sender_id=0, receiver_id=user_id, is_admin=True,
+                                 content=sentence(rng, 12), timestamp=ts))
+        else:
+            messages.append(dict(sender_id=user_id, receiver_id=0, is_admin=False,
+                                 content=sentence(rng, 12), timestamp=ts))
+    insert_batches(Message, messages)
+
+    insert_batches(Order, [
+        dict(
+            topic=sentence(rng, 6), description=sentence(rng, 60),
+            deadline=ts + timedelta(days=rng.randint(1, 30)), word_count=rng.choice([275, 550, 1100, 2750]),
+            level=rng.choice(LEVELS), status=rng.choice(STATUSES), created_at=ts,
+            writer_id=rng.randint(1, n["writers"]), user_id=rng.randint(1, n["users"]),
+        )
+        for ts in timeline(rng, n["orders"], days=365)
+    ])
+    insert_batches(BlogPost, [
+        dict(title=sentence(rng, 8), content=sentence(rng, 400), created_at=ts)
+        for ts in timeline(rng, n["posts"], days=730)
+    ])
+    insert_batches(Announcement, [
+        dict(title=sentence(rng, 5), body=sentence(rng, 40), audience=rng.choice(["public", "writers"]),
+             created_at=ts)
+        for ts in timeline(rng, n["announcements"])
+    ])
+    insert_batches(Testimonial, [
+        dict(name=f"Client {i}", content=sentence(rng, 30), rating=rng.randint(3, 5), created_at=ts)
+        for i, ts in enumerate(timeline(rng, n["testimonials"]))
+    ])
+
+    # Bulk inserts skip the ORM hooks that maintain these summaries.
+    db.session.execute(sa.text("DELETE FROM conversation"))
+    db.session.execute(sa.text("""
+        INSERT INTO conversation (user_id, last_message_id, message_count, unread_count)
+        SELECT CASE WHEN is_admin THEN receiver_id ELSE sender_id END, MAX(id), COUNT(*), 0
+        FROM message
+        GROUP BY CASE WHEN is_admin THEN receiver_id ELSE sender_id END
+    """))
+    db.session.execute(sa.text("""
+        UPDATE conversation
+        SET last_timestamp = (SELECT timestamp FROM message WHERE message.id = conversation.last_message_id)
+    """))
+    db.session.commit()
+    reconcile()
+    db.session.execute(sa.text("ANALYZE"))
+    db.session.commit()
+    return n
+
+
+def build(db_path, scale=1.0):
+    """Create and seed ``db_path`` unless it already exists; returns the app."""
+    from app.schema import create_schema
+
+    exists = os.path.exists(db_path)
+    app = make_app(db_path, tuned=True)
+    if not exists:
+        with app.app_context():
+            create_schema(os.path.join(ROOT, "migrations"))
+            seed(scale)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("db_path")
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args()
+    if os.path.exists(args.db_path):
+        parser.error(f"{args.db_path} already exists")
+
+    start = time.perf_counter()
+    app = build(args.db_path, args.scale)
+    from app.counters import get_counters
+    with app.app_context():
+        counts = get_counters()
+    print(f"Seeded {args.db_path} in {time.perf_counter() - start:.1f}s: "
+          + ", ".join(f"{name} {value}" for name, value in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Concurrent read/write throughput on SQLite, with and without the pragmas.
+
+Runs writer processes inserting leads and chat messages (like ``lead`` and
+``send_message``) next to reader processes doing the homepage/inbox style
+reads, first with SQLite's defaults and then with ``SQLITE_PRAGMAS``.
+
+    python -m benchmarks.sqlite_concurrency --writers 4 --readers 8 --seconds 10
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+
+def make_app(db_path, tuned):
+    import config
+    from app import create_app
+    config.DevelopmentConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+    config.DevelopmentConfig.SQLITE_PRAGMAS = config.Config.SQLITE_PRAGMAS if tuned else {}
+    return create_app("development")
+
+
+def worker(role, db_path, tuned, seconds, results):
+    from sqlalchemy.exc import OperationalError
+    from app.extensions import db
+    from app.models import Lead, Message
+
+    app = make_app(db_path, tuned)
+    ops = errors = 0
+    latencies = []
+    with app.app_context():
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if role == "writer":
+                    db.session.add(Lead(topic="benchmark"))
+                    db.session.add(Message(sender_id=ops % 50, receiver_id=0, content="benchmark"))
+                    db.session.commit()
+                else:
+                    Lead.query.order_by(Lead.created_at.desc()).limit(20).all()
+                    Message.query.filter_by(sender_id=ops % 50).order_by(Message.timestamp.desc()).limit(20).all()
+                    db.session.rollback()
+                ops += 1
+                latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                db.session.rollback()
+                errors += 1
+    results.put((role, ops, errors, latencies))
+
+
+def run(tuned, writers, readers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        from app.extensions import db
+        with make_app(db_path, tuned).app_context():
+            db.create_all()
+
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=("writer", db_path, tuned, seconds, results)) for _ in range(writers)]
+        procs += [ctx.Process(target=worker, args=("reader", db_path, tuned, seconds, results)) for _ in range(readers)]
+        for p in procs:
+            p.start()
+        collected = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+    summary = {}
+    for role, ops, errors, latencies in collected:
+        entry = summary.setdefault(role, {"ops": 0, "errors": 0, "latencies": []})
+        entry["ops"] += ops
+        entry["errors"] += errors
+        entry["latencies"].extend(latencies)
+    return summary
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    for label, tuned in (("default journal", False), ("WAL + pragmas", True)):
+        summary = run(tuned, args.writers, args.readers, args.seconds)
+        print(f"== {label}")
+        for role in ("writer", "reader"):
+            entry = summary.get(role, {"ops": 0, "errors": 0, "latencies": []})
+            print(f"  {role}s: {entry['ops'] / args.seconds:8.1f} ops/s  "
+                  f"p50 {percentile(entry['latencies'], 50) * 1000:6.2f} ms  "
+                  f"p99 {percentile(entry['latencies'], 99) * 1000:7.2f} ms  "
+                  f"locked errors {entry['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Add materialized counter table
+
+Revision ID: 0a9c3e5d7f21
+Revises: f8a4d2b6c913
+Create Date: 2025-08-10 10:33:27.518604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9c3e5d7f21'
+down_revision = 'f8a4d2b6c913'
+branch_labels = None
+depends_on = None
+
+COUNTED_TABLES = {
+    'messages': 'message',
+    'testimonials': 'testimonial',
+    'writers': 'writer',
+    'leads': 'lead',
+    'orders': '"order"',
+    'payments': 'payment',
+}
+
+
+def upgrade():
+    op.create_table('counter',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    # Seed with the current row counts.
+    for name, table in COUNTED_TABLES.items():
+        op.execute(f"INSERT INTO counter (name, value) SELECT '{name}', COUNT(*) FROM {table}")
+
+
+def downgrade():
+    op.drop_table('counter')
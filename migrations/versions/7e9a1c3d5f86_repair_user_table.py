@@ -0,0 +1,37 @@
+"""Repair the user table on databases patched past 793aa7f31122 and 85d3a56153be
+
+Revision ID: 7e9a1c3d5f86
+Revises: 6b8d0f2a4c75
+Create Date: 2025-08-22 09:41:27.530218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e9a1c3d5f86'
+down_revision = '6b8d0f2a4c75'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Those two revisions only run against the database they were written
+    # on, so others were taken past them by hand. Bring any such database
+    # into line; each step is a no-op where they ran cleanly.
+    op.execute('DROP TABLE IF EXISTS _alembic_tmp_user')
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('user')}
+    if 'password_hash' in columns and 'password' not in columns:
+        return
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        if 'password_hash' not in columns:
+            batch_op.add_column(sa.Column('password_hash', sa.String(length=256), nullable=False, server_default=''))
+        if 'password' in columns:
+            batch_op.drop_column('password')
+
+
+def downgrade():
+    # Nothing to undo: the columns it may add or drop match the earlier
+    # revisions' intent.
+    pass
@@ -0,0 +1,28 @@
+"""Add conversation indexes to Message
+
+Revision ID: b7e2c4a91d3f
+Revises: 85d3a56153be
+Create Date: 2025-08-02 10:14:52.613208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4a91d3f'
+down_revision = '85d3a56153be'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.create_index('ix_message_sender_id_timestamp', ['sender_id', 'timestamp'], unique=False)
+        batch_op.create_index('ix_message_receiver_id_timestamp', ['receiver_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.drop_index('ix_message_receiver_id_timestamp')
+        batch_op.drop_index('ix_message_sender_id_timestamp')
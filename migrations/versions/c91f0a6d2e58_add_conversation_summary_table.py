@@ -0,0 +1,48 @@
+"""Add conversation summary table
+
+Revision ID: c91f0a6d2e58
+Revises: b7e2c4a91d3f
+Create Date: 2025-08-03 16:41:09.352871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c91f0a6d2e58'
+down_revision = 'b7e2c4a91d3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('conversation',
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=False),
+    sa.Column('last_timestamp', sa.DateTime(), nullable=True),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_conversation_last_timestamp'), ['last_timestamp'], unique=False)
+
+    # Backfill one summary row per existing thread.
+    op.execute("""
+        INSERT INTO conversation (user_id, last_message_id, message_count, unread_count)
+        SELECT CASE WHEN is_admin THEN receiver_id ELSE sender_id END, MAX(id), COUNT(*), 0
+        FROM message
+        GROUP BY CASE WHEN is_admin THEN receiver_id ELSE sender_id END
+    """)
+    op.execute("""
+        UPDATE conversation
+        SET last_timestamp = (SELECT timestamp FROM message WHERE message.id = conversation.last_message_id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('conversation', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_conversation_last_timestamp'))
+
+    op.drop_table('conversation')
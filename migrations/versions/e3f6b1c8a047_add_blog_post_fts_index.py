@@ -0,0 +1,57 @@
+"""Add FTS5 full-text index for blog posts
+
+Revision ID: e3f6b1c8a047
+Revises: d52a8e7f1b34
+Create Date: 2025-08-07 11:52:18.490316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f6b1c8a047'
+down_revision = 'd52a8e7f1b34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other backends fall back to LIKE search.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE blog_post_fts USING fts5(
+            title, content, content='blog_post', content_rowid='id', tokenize='porter unicode61'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER blog_post_fts_ai AFTER INSERT ON blog_post BEGIN
+            INSERT INTO blog_post_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER blog_post_fts_ad AFTER DELETE ON blog_post BEGIN
+            INSERT INTO blog_post_fts (blog_post_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER blog_post_fts_au AFTER UPDATE ON blog_post BEGIN
+            INSERT INTO blog_post_fts (blog_post_fts, rowid, title, content)
+            VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO blog_post_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """)
+    op.execute("INSERT INTO blog_post_fts (blog_post_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS blog_post_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS blog_post_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS blog_post_fts_ai")
+    op.execute("DROP TABLE IF EXISTS blog_post_fts")
@@ -0,0 +1,67 @@
+"""Add order indexes and FTS5 search over topic and description
+
+Revision ID: f8a4d2b6c913
+Revises: e3f6b1c8a047
+Create Date: 2025-08-08 14:06:41.772930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8a4d2b6c913'
+down_revision = 'e3f6b1c8a047'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.create_index('ix_order_status_created_at', ['status', 'created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_user_id'), ['user_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_writer_id'), ['writer_id'], unique=False)
+
+    # FTS5 is SQLite-only; other backends fall back to LIKE search.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE order_fts USING fts5(
+            topic, description, content='order', content_rowid='id', tokenize='porter unicode61'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER order_fts_ai AFTER INSERT ON "order" BEGIN
+            INSERT INTO order_fts (rowid, topic, description) VALUES (new.id, new.topic, new.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER order_fts_ad AFTER DELETE ON "order" BEGIN
+            INSERT INTO order_fts (order_fts, rowid, topic, description)
+            VALUES ('delete', old.id, old.topic, old.description);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER order_fts_au AFTER UPDATE OF topic, description ON "order" BEGIN
+            INSERT INTO order_fts (order_fts, rowid, topic, description)
+            VALUES ('delete', old.id, old.topic, old.description);
+            INSERT INTO order_fts (rowid, topic, description) VALUES (new.id, new.topic, new.description);
+        END
+    """)
+    op.execute("INSERT INTO order_fts (order_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS order_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS order_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS order_fts_ai")
+        op.execute("DROP TABLE IF EXISTS order_fts")
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_writer_id'))
+        batch_op.drop_index(batch_op.f('ix_order_user_id'))
+        batch_op.drop_index(batch_op.f('ix_order_created_at'))
+        batch_op.drop_index('ix_order_status_created_at')
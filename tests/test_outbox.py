@@ -0,0 +1,127 @@
+"""The outbox worker against a real SMTP server (aiosmtpd on localhost)."""
+import socket
+
+import pytest
+from flask_mail import Connection
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+from app import create_app, mail
+from app.extensions import db
+from app.models import OutboundEmail
+from app.outbox import queue_email, send_pending
+
+REFUSED = "refused@example.com"
+
+
+class Inbox:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REFUSED:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp():
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, inbox
+    controller.stop()
+
+
+@pytest.fixture
+def app(smtp):
+    controller, _ = smtp
+    app = create_app("testing")
+    app.config.update(
+        MAIL_SERVER=controller.hostname, MAIL_PORT=controller.port, MAIL_USE_TLS=False,
+        MAIL_USERNAME=None, MAIL_PASSWORD=None, MAIL_SUPPRESS_SEND=False,
+        MAIL_DEFAULT_SENDER="noreply@example.com",
+    )
+    mail.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def queue(*recipients):
+    for recipient in recipients:
+        queue_email("Order received", [recipient], "Thanks for your order.")
+    db.session.commit()
+
+
+def test_delivers_due_emails(app, smtp):
+    _, inbox = smtp
+    queue("a@example.com", "b@example.com")
+
+    assert send_pending() == (2, 0)
+    assert sorted(e.rcpt_tos[0] for e in inbox.messages) == ["a@example.com", "b@example.com"]
+    assert {e.status for e in OutboundEmail.query} == {"sent"}
+    assert send_pending() == (0, 0)
+
+
+def test_refused_recipient_is_retried_later(app, smtp):
+    _, inbox = smtp
+    queue(REFUSED, "a@example.com")
+
+    assert send_pending() == (1, 1)
+    assert len(inbox.messages) == 1
+    refused = OutboundEmail.query.filter_by(recipients=REFUSED).one()
+    assert refused.status == "pending"
+    assert refused.attempts == 1
+    assert "No such user" in refused.last_error
+    # Backed off, so not due again straight away.
+    assert send_pending() == (0, 0)
+
+
+def test_unreachable_server_backs_off_the_batch(app):
+    queue("a@example.com", "b@example.com")
+    app.config["MAIL_PORT"] = free_port()  # nothing listening
+    mail.init_app(app)
+
+    assert send_pending() == (0, 2)
+    assert {(e.status, e.attempts) for e in OutboundEmail.query} == {("pending", 1)}
+
+
+def test_sent_status_survives_a_crash_mid_batch(app, smtp, monkeypatch):
+    _, inbox = smtp
+    queue("a@example.com", "b@example.com")
+    real_send = Connection.send
+    calls = []
+
+    def send_then_crash(self, message, envelope_from=None):
+        calls.append(message)
+        if len(calls) == 2:
+            raise RuntimeError("worker killed")
+        return real_send(self, message, envelope_from)
+
+    monkeypatch.setattr(Connection, "send", send_then_crash)
+    with pytest.raises(RuntimeError):
+        send_pending()
+    db.session.rollback()
+
+    statuses = dict(db.session.query(OutboundEmail.recipients, OutboundEmail.status))
+    assert statuses == {"a@example.com": "sent", "b@example.com": "pending"}
+    assert len(inbox.messages) == 1
+
+    monkeypatch.setattr(Connection, "send", real_send)
+    assert send_pending() == (1, 0)
+    assert len(inbox.messages) == 2